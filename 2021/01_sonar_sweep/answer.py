@@ -1,29 +1,67 @@
 import argparse
 from pathlib import Path
+import sys
+from typing import Iterable, Sequence
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.lazy import lazy_import  # noqa: E402
 
-def hm_larger_than_previous(path: Path, sliding_window_size: int) -> int:
-    # initialize and read out depths
-    answer = 0
-    current_depth = None
-    previous_depth = None
-    with open(path) as f:
-        depths = list(map(int, f.readlines()))
+np = lazy_import("numpy")  # only needed for batches of depth series
 
-    for idx, depth in enumerate(depths):
-        # compute current_depth if sliding_window has reached target size
-        window_start_idx = idx - (sliding_window_size - 1)
-        if window_start_idx >= 0:
-            current_depth = sum(depths[window_start_idx : idx + 1])
 
-        # increment answer and update previous depth
-        if previous_depth is not None and current_depth > previous_depth:
+def count_increases(depths: Iterable[int], sliding_window_size: int) -> int:
+    """
+    Streaming count of sliding window sums larger than the previous one with constant memory.
+    Two consecutive windows share all but one depth: sum(d[i-w+1:i+1]) > sum(d[i-w:i]) is
+    equivalent to d[i] > d[i-w], so only the last w depths are kept in a ring buffer
+    """
+    if sliding_window_size < 1:
+        raise ValueError(f"Sliding window size has to be >= 1, not {sliding_window_size}")
+    answer = 0
+    ring = [0] * sliding_window_size
+    for idx, depth in enumerate(depths):
+        ring_idx = idx % sliding_window_size
+        if idx >= sliding_window_size and depth > ring[ring_idx]:
             answer += 1
-        if current_depth is not None:
-            previous_depth = current_depth
+        ring[ring_idx] = depth
     return answer
 
 
+def hm_larger_than_previous(path: Path, sliding_window_size: int) -> int:
+    with open(path) as f:
+        return count_increases(map(int, f), sliding_window_size)
+
+
+def load_depth_series(paths: Iterable[Path]) -> list["np.ndarray"]:
+    return [np.array(Path(path).read_bytes().split(), dtype=np.int64) for path in paths]
+
+
+def count_increases_batch(
+    depth_series: "np.ndarray | Sequence[np.ndarray]", sliding_window_sizes: Sequence[int]
+) -> "np.ndarray":
+    """
+    Vectorized count_increases for many depth series and window sizes at once.
+    depth_series ... 2-d array (one series per row) or ragged list of 1-d arrays
+    Returns array of shape (n_series, n_window_sizes)
+    """
+    if any(w < 1 for w in sliding_window_sizes):
+        raise ValueError(f"Sliding window sizes have to be >= 1, not {sliding_window_sizes}")
+    counts = np.zeros((len(depth_series), len(sliding_window_sizes)), dtype=np.int64)
+    if isinstance(depth_series, np.ndarray) and depth_series.ndim == 2:
+        for idx, w in enumerate(sliding_window_sizes):
+            counts[:, idx] = (depth_series[:, w:] > depth_series[:, :-w]).sum(axis=1)
+        return counts
+
+    # ragged series: concatenate them and only compare depths of the same series
+    lengths = [len(depths) for depths in depth_series]
+    depths = np.concatenate(depth_series)
+    series_idx = np.repeat(np.arange(len(lengths)), lengths)
+    for idx, w in enumerate(sliding_window_sizes):
+        increases = (depths[w:] > depths[:-w]) & (series_idx[w:] == series_idx[:-w])
+        counts[:, idx] = np.bincount(series_idx[w:][increases], minlength=len(lengths))
+    return counts
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="How many measurements are larger than the previous measurement?"
@@ -0,0 +1,202 @@
+from abc import ABC, abstractmethod
+import argparse
+from functools import reduce
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.chunks import chunk_boundaries  # noqa: E402
+from utils.lazy import lazy_import  # noqa: E402
+
+futures = lazy_import("concurrent.futures")  # only used with several workers
+
+
+COMMANDS = (b"down", b"forward", b"up")  # index = opcode
+DOWN, FORWARD, UP = range(3)
+COMMAND_LEN = np.array([len(c) for c in COMMANDS])
+OPCODE_LUT = np.full(256, -1, dtype=np.int64)  # first letter of a command -> opcode
+OPCODE_LUT[[c[0] for c in COMMANDS]] = range(len(COMMANDS))
+
+# Summary of a sequence of commands which is independent of the state before it:
+# (hor. pos. change, aim change, depth change if the aim was 0 at the start)
+# Part 1 uses the aim as depth: answer = hor_pos * aim, part 2: answer = hor_pos * depth
+Summary = tuple[int, int, int]
+
+
+def parse_commands(data: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Bulk tokenizer working on the raw bytes: returns arrays of opcodes and units of all lines
+    """
+    x = np.frombuffer(data.rstrip(), dtype=np.uint8)
+    if not len(x):
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    line_ends = np.append(np.flatnonzero(x == ord("\n")), len(x))
+    line_starts = np.concatenate([[0], line_ends[:-1] + 1])
+    line_ends -= x[line_ends - 1] == ord("\r")
+
+    # the first letter gives the opcode, then the whole command and the space behind it are checked
+    opcodes = OPCODE_LUT[x[line_starts]]
+    unit_starts = line_starts + COMMAND_LEN[opcodes] + 1
+    n_digits = line_ends - unit_starts
+    invalid = (opcodes < 0) | (n_digits < 1)
+    invalid[~invalid] |= x[unit_starts[~invalid] - 1] != ord(" ")
+    for opcode, command in enumerate(COMMANDS):
+        lines = np.flatnonzero(~invalid & (opcodes == opcode))
+        chars = x[line_starts[lines, np.newaxis] + np.arange(len(command))]
+        invalid[lines] = (chars != np.frombuffer(command, dtype=np.uint8)).any(axis=1)
+    if invalid.any():
+        idx = np.flatnonzero(invalid)[0]
+        line = bytes(x[line_starts[idx] : line_ends[idx]]).decode()
+        raise ValueError(f"Command {line} not implemented")
+
+    # units: sum of digit * 10^exponent over the digits of each line
+    offsets = np.cumsum(n_digits) - n_digits
+    positions = np.arange(n_digits.sum()) + np.repeat(unit_starts - offsets, n_digits)
+    digits = x[positions].astype(np.int64) - ord("0")
+    if ((digits < 0) | (digits > 9)).any():
+        raise ValueError("Units have to be positive integers")
+    exponents = np.repeat(line_ends - 1, n_digits) - positions
+    return opcodes, np.add.reduceat(digits * 10**exponents, offsets)
+
+
+def summarize(opcodes: np.ndarray, units: np.ndarray) -> Summary:
+    forward = np.where(opcodes == FORWARD, units, 0)
+    aim = np.cumsum(np.where(opcodes == DOWN, units, 0) - np.where(opcodes == UP, units, 0))
+    return int(forward.sum()), int(aim[-1]) if len(aim) else 0, int(np.dot(aim, forward))
+
+
+def merge(x: Summary, y: Summary) -> Summary:
+    """
+    Associative combination of the summaries of two consecutive command sequences: the aim at
+    the end of x adds aim * forward units of y to the depth
+    """
+    return x[0] + y[0], x[1] + y[1], x[2] + y[2] + x[1] * y[0]
+
+
+def _summarize_chunk(path: Path, start: int, end: int) -> Summary:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return summarize(*parse_commands(f.read(end - start)))
+
+
+def summarize_file(path: Path, n_workers: int = 1) -> Summary:
+    if n_workers == 1:
+        return summarize(*parse_commands(path.read_bytes()))
+    chunks = chunk_boundaries(path, n_workers)
+    with futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        summaries = executor.map(_summarize_chunk, *zip(*[(path, *c) for c in chunks]))
+        return reduce(merge, summaries, (0, 0, 0))
+
+
+### Pluggable movement models #####################################################################
+class MovementModel(ABC):
+    """
+    Base class of the submarine's movement models. User-defined models implement forward, down
+    and up, which are called once per command in order. apply() may be overridden with a
+    vectorized version working on the opcodes and units of a whole block of commands
+    """
+
+    def __init__(self):
+        self.hor_pos = 0
+        self.depth = 0
+
+    @abstractmethod
+    def forward(self, units: int):
+        ...
+
+    @abstractmethod
+    def down(self, units: int):
+        ...
+
+    @abstractmethod
+    def up(self, units: int):
+        ...
+
+    def apply(self, opcodes: np.ndarray, units: np.ndarray):
+        handlers = (self.down, self.forward, self.up)  # index = opcode
+        for opcode, u in zip(opcodes.tolist(), units.tolist()):
+            handlers[opcode](u)
+
+    def answer(self) -> int:
+        return self.hor_pos * self.depth
+
+
+class PositionModel(MovementModel):  # part 1
+    def forward(self, units: int):
+        self.hor_pos += units
+
+    def down(self, units: int):
+        self.depth += units
+
+    def up(self, units: int):
+        self.depth -= units
+
+    def apply(self, opcodes: np.ndarray, units: np.ndarray):
+        hor_pos, aim, _ = summarize(opcodes, units)
+        self.hor_pos += hor_pos
+        self.depth += aim
+
+
+class AimModel(MovementModel):  # part 2
+    def __init__(self):
+        super().__init__()
+        self.aim = 0
+
+    def forward(self, units: int):
+        self.hor_pos += units
+        self.depth += self.aim * units
+
+    def down(self, units: int):
+        self.aim += units
+
+    def up(self, units: int):
+        self.aim -= units
+
+    def apply(self, opcodes: np.ndarray, units: np.ndarray):
+        state = (self.hor_pos, self.aim, self.depth)
+        self.hor_pos, self.aim, self.depth = merge(state, summarize(opcodes, units))
+
+
+def interpret(
+    path: Path, models: list[MovementModel], block_size: int = 2**24
+) -> list[MovementModel]:
+    """
+    Single streaming pass over the command file: each block of lines is tokenized once and
+    passed to all models
+    """
+    rest = b""
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            block, _, rest = (rest + block).rpartition(b"\n")  # incomplete last line -> next block
+            commands = parse_commands(block)
+            for model in models:
+                model.apply(*commands)
+    commands = parse_commands(rest)
+    for model in models:
+        model.apply(*commands)
+    return models
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Final position of submarin going forward, down and up by certain units:"
+    )
+    parser.add_argument("-i", help="Input file path")
+    parser.add_argument("-w", type=int, default=1, help="Number of processes")
+    args = parser.parse_args()
+    path = Path(args.i) if args.i else Path("example_input.txt")
+    assert path.exists()
+
+    if args.w > 1:  # parallel chunks only support the built-in models
+        hor_pos, aim, depth = summarize_file(path, n_workers=args.w)
+        print(f"Part 1 - Depth: {aim}, Hor. Pos.: {hor_pos}, Answer: {aim * hor_pos}")
+        print(f"Part 2 - Depth: {depth}, Hor. Pos.: {hor_pos}, Answer: {depth * hor_pos}")
+    else:
+        models = interpret(path, [PositionModel(), AimModel()])
+        for part, model in enumerate(models, start=1):
+            print(
+                f"Part {part} - Depth: {model.depth}, Hor. Pos.: {model.hor_pos}, "
+                f"Answer: {model.answer()}"
+            )
@@ -1,6 +1,13 @@
 import argparse
 import copy
 from pathlib import Path
+import sys
+from typing import Callable
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.grid import load_grid  # noqa: E402
 
 
 def bitwise_not_for_fixed_number_of_bits(number, n_bits):
@@ -31,6 +38,33 @@ def power_consumption(path: Path) -> int:
     return gamma_rate * epsilon_rate
 
 
+def load_bit_matrix(path: Path) -> np.ndarray:
+    """
+    Diagnostic report as uint8 array of shape (n_numbers, n_bits), most significant bit first
+    """
+    return load_grid(path, symbols="01")
+
+
+def bits_to_int(bits: np.ndarray) -> int:
+    """
+    Python int (no width limit) of a 1-d array of 0/1 values, most significant bit first
+    """
+    padding = -len(bits) % 8
+    return int.from_bytes(np.packbits(bits).tobytes(), "big") >> padding
+
+
+def power_consumption_vectorized(path: Path) -> int:
+    """
+    Same as power_consumption, but counting the 1-bits of all columns at once with a single
+    reduction over the bit matrix. Works for any number of bits
+    """
+    bits = load_bit_matrix(path)
+    n_ones = bits.sum(axis=0, dtype=np.int64)
+    assert (2 * n_ones != len(bits)).all()
+    gamma_bits = (2 * n_ones > len(bits)).astype(np.uint8)
+    return bits_to_int(gamma_bits) * bits_to_int(1 - gamma_bits)
+
+
 def life_support_rating(path: Path) -> int:
     def get_rating(numbers_str: list[str], filter_most_common: bool) -> int:
         for bit_idx in range(n_bits):  # only consider the first 5 bits
@@ -55,6 +89,53 @@ def life_support_rating(path: Path) -> int:
     return o2_gen_rating * co2_gen_rating
 
 
+# bit criteria: (n_zeros, n_ones) at the current bit position -> keep the numbers with a 1-bit?
+BitCriteria = Callable[[int, int], bool]
+O2_CRITERIA: BitCriteria = lambda n_zeros, n_ones: n_ones >= n_zeros  # most common, tie -> 1
+CO2_CRITERIA: BitCriteria = lambda n_zeros, n_ones: n_ones < n_zeros  # least common, tie -> 0
+
+
+class DiagnosticIndex:
+    """
+    Diagnostic numbers sorted once. All numbers sharing a prefix form a contiguous range of the
+    sorted array, so filtering by the bit criteria only narrows [lo, hi) down with one binary
+    search per bit: O(n_bits * log(n)) per rating instead of rebuilding lists of strings
+    """
+
+    def __init__(self, bits: np.ndarray):
+        self.n_bits = bits.shape[1]
+        if self.n_bits <= 64:
+            shifts = np.arange(self.n_bits - 1, -1, -1, dtype=np.uint64)
+            numbers = (bits.astype(np.uint64) << shifts).sum(axis=1)
+        else:  # Python ints
+            numbers = np.array([bits_to_int(row) for row in bits], dtype=object)
+        self.numbers = np.sort(numbers)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "DiagnosticIndex":
+        return cls(load_bit_matrix(path))
+
+    def rating(self, keep_ones: BitCriteria) -> int:
+        lo, hi, prefix = 0, len(self.numbers), 0
+        for bit_idx in reversed(range(self.n_bits)):
+            if hi - lo == 1:
+                break
+            with_bit = prefix | (1 << bit_idx)
+            split = int(np.searchsorted(self.numbers, self.numbers.dtype.type(with_bit)))
+            n_zeros, n_ones = split - lo, hi - split
+            if n_zeros == 0 or (n_ones > 0 and keep_ones(n_zeros, n_ones)):
+                lo, prefix = split, with_bit
+            else:
+                hi = split
+        assert hi - lo == 1
+        return int(self.numbers[lo])
+
+
+def life_support_rating_indexed(path: Path) -> int:
+    index = DiagnosticIndex.from_file(path)
+    return index.rating(O2_CRITERIA) * index.rating(CO2_CRITERIA)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Advent of Code Day 03: Binary Diagnostic:")
     parser.add_argument("-i", help="Input file path")
@@ -62,5 +143,5 @@ if __name__ == "__main__":
     path = Path(args.i) if args.i else Path("example_input.txt")
     assert path.exists()
 
-    print(f"Power consumption: {power_consumption(path)}")
-    print(f"Live support rating: {life_support_rating(path)}")
+    print(f"Power consumption: {power_consumption_vectorized(path)}")
+    print(f"Live support rating: {life_support_rating_indexed(path)}")
@@ -1,7 +1,8 @@
 import argparse
+from collections import defaultdict
 import copy
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 import numpy as np
 
@@ -27,6 +28,10 @@ class Board:
         #     return True
         return False
 
+    @property
+    def numbers(self) -> np.ndarray:
+        return self._board
+
     def final_score(self) -> int:
         return np.sum(self._board[~self._marked]) * self._last_called_number
 
@@ -55,27 +60,107 @@ def parse_input(path: Path) -> tuple[list[Board], list[int]]:
     return boards, seq
 
 
-# why is it so slow?
+def _draw_times(boards: np.ndarray, seq: Sequence[int]) -> np.ndarray:
+    """
+    Replaces each board number by its index in the sequence (len(seq) if it's never drawn)
+    """
+    draw_times = np.full(max(boards.max(), max(seq)) + 1, len(seq), dtype=np.int64)
+    np.minimum.at(draw_times, seq, np.arange(len(seq)))  # first occurrence counts
+    return draw_times[boards]
+
+
+def win_turns(boards: np.ndarray, seq: Sequence[int]) -> np.ndarray:
+    """
+    Closed form win turn of many boards at once (no simulation).
+    boards ... array of shape (n_boards, 5, 5)
+    A row or column is complete at the max. draw time of its numbers and a board wins at its
+    earliest complete row or column.
+    Returns the index of the winning number in seq per board (len(seq) if the board never wins)
+    """
+    times = _draw_times(boards, seq)
+    return np.minimum(times.max(axis=2).min(axis=1), times.max(axis=1).min(axis=1))
+
+
+def final_scores(boards: np.ndarray, seq: Sequence[int], turns: np.ndarray) -> np.ndarray:
+    """
+    Final score of every board at its win turn (sum of unmarked numbers * winning number)
+    """
+    unmarked = _draw_times(boards, seq) > turns[:, np.newaxis, np.newaxis]
+    winning_numbers = np.append(seq, 0)[turns]  # boards which never win score 0
+    return (boards * unmarked).sum(axis=(1, 2)) * winning_numbers
+
+
+def _get_board_at_win(boards: list[Board], seq: list[int], board_idx: int, turn: int) -> Board:
+    board = copy.deepcopy(boards[board_idx])
+    for number in seq[: turn + 1]:
+        board.mark(number)
+    return board
+
+
 def get_first_winning_board(boards: list[Board], seq: list[int]) -> Board:
-    for number in seq:
-        for board in boards:
-            board.mark(number)
-            if board.is_win():
-                return board
-    raise ValueError(f"Sequence {seq} not long enough for any board to win")
+    turns = win_turns(np.array([board.numbers for board in boards]), seq)
+    board_idx = int(np.argmin(turns))  # first board on ties
+    if turns[board_idx] == len(seq):
+        raise ValueError(f"Sequence {seq} not long enough for any board to win")
+    return _get_board_at_win(boards, seq, board_idx, turns[board_idx])
 
 
 def get_last_winning_board(boards: list[Board], seq: list[int]) -> Board:
-    boards.reverse()
-    for number in seq:
-        for idx in reversed(range(len(boards))):
-            boards[idx].mark(number)
-            if boards[idx].is_win():
-                if len(boards) == 1:
-                    return boards[idx]
-                else:
-                    del boards[idx]
-    raise ValueError(f"Sequence {seq} not long enough for all boards to win")
+    turns = win_turns(np.array([board.numbers for board in boards]), seq)
+    board_idx = len(turns) - 1 - int(np.argmax(turns[::-1]))  # last board on ties
+    if turns[board_idx] == len(seq):
+        raise ValueError(f"Sequence {seq} not long enough for all boards to win")
+    return _get_board_at_win(boards, seq, board_idx, turns[board_idx])
+
+
+WinRecord = tuple[int, int, int]  # (board index, winning number, final score)
+
+
+class BingoEngine:
+    """
+    Inverted index number -> cells (board, row, column) of all boards. Each board has 5 row
+    and 5 column hit counters in one flat list, so calling a number only touches the cells
+    containing it. The win order of all boards is found in a single pass over the sequence
+    """
+
+    def __init__(self, boards: Sequence[Sequence[Sequence[int]]], size: int = 5):
+        self.size = size
+        self.n_boards = len(boards)
+        self.cells: dict[int, list[tuple[int, int, int]]] = defaultdict(list)
+        self.board_sums = list()
+        for b_idx, board in enumerate(boards):
+            counter_idx = 2 * size * b_idx  # flat index of the board's first counter
+            for row, numbers in enumerate(board):
+                for col, number in enumerate(numbers):
+                    self.cells[int(number)].append(
+                        (b_idx, counter_idx + row, counter_idx + size + col)
+                    )
+            self.board_sums.append(int(sum(sum(numbers) for numbers in board)))
+
+    def win_order(self, seq: Sequence[int]) -> list[WinRecord]:
+        hits = [0] * (2 * self.size * self.n_boards)
+        unmarked_sums = self.board_sums.copy()
+        won = [False] * self.n_boards
+        order = list()
+        called = set()
+        for number in seq:
+            if number in called:  # marking is idempotent: its cells are marked already
+                continue
+            called.add(number)
+            cells = self.cells.get(number, ())
+            for b_idx, row_counter, col_counter in cells:
+                if not won[b_idx]:
+                    unmarked_sums[b_idx] -= number
+                    hits[row_counter] += 1
+                    hits[col_counter] += 1
+            # wins are checked after all cells are marked (a board may contain a number twice)
+            for b_idx, row_counter, col_counter in cells:
+                if not won[b_idx] and self.size in (hits[row_counter], hits[col_counter]):
+                    won[b_idx] = True
+                    order.append((b_idx, number, unmarked_sums[b_idx] * number))
+            if len(order) == self.n_boards:
+                break
+        return order
 
 
 if __name__ == "__main__":
@@ -86,7 +171,7 @@ if __name__ == "__main__":
     assert path.exists()
     boards, seq = parse_input(path)
 
-    winner_board = get_first_winning_board(copy.deepcopy(boards), seq)
+    winner_board = get_first_winning_board(boards, seq)
     print(f"First winning board: {winner_board} with final score {winner_board.final_score()}")
 
     worst_board = get_last_winning_board(boards, seq)
@@ -5,37 +5,184 @@ import re
 import numpy as np
 
 
-def get_vent_map(path: Path, no_diag_lines: bool = False) -> np.ndarray:
-    # determine necessary map size
-    vent_lines_hv, vent_lines_diag = [], []
-    max_y, max_x = 0, 0
-    with open(path) as f:
-        for line in f:
-            x0, y0, x1, y1 = map(int, re.split(" -> |,", line))  # parse text line
-
-            if y0 == y1 or x0 == x1:  # consider hor. and ver. vent lines
-                max_y, max_x = max(max_y, y0, y1), max(max_x, x0, x1)
-                if y0 + x0 < y1 + x1:
-                    vent_lines_hv.append(((y0, y1), (x0, x1)))
-                else:
-                    vent_lines_hv.append(((y1, y0), (x1, x0)))
-
-            elif not no_diag_lines:  # consider vertical vent line lines
-                max_y, max_x = max(max_y, y0, y1), max(max_x, x0, x1)
-                y_sign, x_sign = np.sign(y1 - y0), np.sign(x1 - x0)
-                vent_line_ys, vent_line_xs = [], []
-                for idx in range(abs(y1 - y0) + 1):
-                    vent_line_ys.append(y0 + y_sign * idx)
-                    vent_line_xs.append(x0 + x_sign * idx)
-                vent_lines_diag.append((vent_line_ys, vent_line_xs))
-
-    # create vent map
-    vent_map = np.zeros(shape=(max_y + 1, max_x + 1), dtype=np.uint8)
-    for vl in vent_lines_hv:
-        vent_map[vl[0][0] : vl[0][1] + 1, vl[1][0] : vl[1][1] + 1] += 1
-    for vl in vent_lines_diag:
-        vent_map[tuple(vl)] += 1
-    return vent_map
+VENT_LINE = re.compile(r"(\d+),(\d+) -> (\d+),(\d+)")
+
+
+def parse_vent_lines(path: Path, no_diag_lines: bool = False) -> np.ndarray:
+    """
+    All vent lines as array of shape (n, 4): x0, y0, x1, y1 (one regex pass over the file)
+    """
+    vent_lines = np.array(VENT_LINE.findall(path.read_text()), dtype=np.int64).reshape(-1, 4)
+    if no_diag_lines:
+        x0, y0, x1, y1 = vent_lines.T
+        vent_lines = vent_lines[(x0 == x1) | (y0 == y1)]
+    return vent_lines
+
+
+def counter_dtype(n_lines: int) -> np.dtype:
+    """
+    Smallest unsigned dtype which can count the overlap of all vent lines without overflow
+    """
+    return np.dtype(np.uint8 if n_lines < 2**8 else np.uint16 if n_lines < 2**16 else np.uint32)
+
+
+def rasterize(vent_lines: np.ndarray, dtype=None) -> np.ndarray:
+    """
+    Vent map of hor., ver. and 45° vent lines: all covered cells are generated with array
+    arithmetic and counted with a single bincount on their flat indices
+    """
+    x0, y0, x1, y1 = vent_lines.T
+    dx, dy = x1 - x0, y1 - y0
+    if ((dx != 0) & (dy != 0) & (np.abs(dx) != np.abs(dy))).any():
+        raise ValueError("Vent lines have to be horizontal, vertical or 45°")
+    shape = (vent_lines[:, 1::2].max(initial=0) + 1, vent_lines[:, ::2].max(initial=0) + 1)
+
+    lengths = np.maximum(np.abs(dx), np.abs(dy)) + 1
+    line_starts = np.cumsum(lengths) - lengths
+    steps = np.arange(lengths.sum()) - np.repeat(line_starts, lengths)  # 0..length-1 per line
+    xs = np.repeat(x0, lengths) + steps * np.repeat(np.sign(dx), lengths)
+    ys = np.repeat(y0, lengths) + steps * np.repeat(np.sign(dy), lengths)
+    counts = np.bincount(ys * shape[1] + xs, minlength=shape[0] * shape[1])
+    return counts.astype(dtype or counter_dtype(len(vent_lines))).reshape(shape)
+
+
+def get_vent_map(path: Path, no_diag_lines: bool = False, dtype=None) -> np.ndarray:
+    return rasterize(parse_vent_lines(path, no_diag_lines), dtype)
+
+
+### Sparse overlap counting (no dense vent map) ###################################################
+# Each vent line is a segment on a line of one of 4 families. Per family the line is given by a
+# constant and the points on it by a parameter:
+#   "h": y = const, param x | "v": x = const, param y | "d": x - y = const, param x
+#   "a": x + y = const, param x
+FAMILIES = ("h", "v", "d", "a")
+Segments = dict[str, np.ndarray]  # family -> array of shape (n, 3): const, param start, end
+
+
+def to_segments(vent_lines: np.ndarray) -> Segments:
+    segments: dict[str, list[tuple[int, int, int]]] = {family: [] for family in FAMILIES}
+    for x0, y0, x1, y1 in vent_lines.tolist():
+        if y0 == y1:
+            segments["h"].append((y0, min(x0, x1), max(x0, x1)))
+        elif x0 == x1:
+            segments["v"].append((x0, min(y0, y1), max(y0, y1)))
+        elif x1 - x0 == y1 - y0:
+            segments["d"].append((x0 - y0, min(x0, x1), max(x0, x1)))
+        elif x1 - x0 == y0 - y1:
+            segments["a"].append((x0 + y0, min(x0, x1), max(x0, x1)))
+        else:
+            raise ValueError(f"Vent line {(x0, y0, x1, y1)} is not horizontal, vertical or 45°")
+    return {family: np.array(s, dtype=np.int64).reshape(-1, 3) for family, s in segments.items()}
+
+
+def _collinear_overlap_length(segments: np.ndarray, min_overlap: int) -> int:
+    """
+    Number of points covered by >= min_overlap segments of the same family (sorted events)
+    """
+    if not len(segments):
+        return 0
+    consts = np.concatenate([segments[:, 0], segments[:, 0]])
+    positions = np.concatenate([segments[:, 1], segments[:, 2] + 1])
+    deltas = np.concatenate([np.ones(len(segments)), -np.ones(len(segments))]).astype(np.int64)
+    order = np.lexsort((positions, consts))
+    consts, positions = consts[order], positions[order]
+    coverage = np.cumsum(deltas[order])  # each line returns to 0 at its end
+    # coverage between an event and the next one on the same line (last event per position)
+    last = np.append((consts[1:] != consts[:-1]) | (positions[1:] != positions[:-1]), True)
+    consts, positions, coverage = consts[last], positions[last], coverage[last]
+    lengths = np.append(np.where(consts[1:] == consts[:-1], np.diff(positions), 0), 0)
+    return int(lengths[coverage >= min_overlap].sum())
+
+
+def _segment_intersections(
+    f1: str, s1: np.ndarray, f2: str, s2: np.ndarray, block_size: int = 2**22
+) -> np.ndarray:
+    """
+    Intersection points (array of shape (n, 2): x, y) of segments of two different families
+    """
+    points = [np.zeros((0, 2), dtype=np.int64)]
+    c2, a2, b2 = s2[:, 0], s2[:, 1], s2[:, 2]
+    n_rows = max(1, block_size // len(s2))  # bounds the memory of the broadcasted blocks
+    for start in range(0, len(s1), n_rows):
+        block = s1[start : start + n_rows]
+        c1, a1, b1 = block[:, 0:1], block[:, 1:2], block[:, 2:3]
+        valid = np.ones((len(block), len(s2)), dtype=bool)
+        if (f1, f2) == ("h", "v"):
+            x, y = c2 + 0 * c1, c1 + 0 * c2
+        elif (f1, f2) == ("h", "d"):
+            x, y = c2 + c1, c1 + 0 * c2
+        elif (f1, f2) == ("h", "a"):
+            x, y = c2 - c1, c1 + 0 * c2
+        elif (f1, f2) == ("v", "d"):
+            x, y = c1 + 0 * c2, c1 - c2
+        elif (f1, f2) == ("v", "a"):
+            x, y = c1 + 0 * c2, c2 - c1
+        else:  # ("d", "a"): diagonals only cross on grid points if their constants' sum is even
+            valid = (c1 + c2) % 2 == 0
+            x, y = (c1 + c2) // 2, (c2 - c1) // 2
+        p1 = y if f1 == "v" else x
+        p2 = y if f2 == "v" else x
+        valid &= (a1 <= p1) & (p1 <= b1) & (a2 <= p2) & (p2 <= b2)
+        points.append(np.stack([x[valid], y[valid]], axis=1))
+    return np.concatenate(points)
+
+
+def _coverage_at(segments: np.ndarray, consts: np.ndarray, params: np.ndarray) -> np.ndarray:
+    """
+    Number of segments (of one family) covering the points given by line constant and param
+    """
+    if not len(segments) or not len(consts):
+        return np.zeros(len(consts), dtype=np.int64)
+    c_min = min(segments[:, 0].min(), consts.min())
+    p_min = min(segments[:, 1].min(), params.min())
+    span = max(segments[:, 2].max(), params.max()) - p_min + 2
+    key = lambda c, p: (c - c_min) * span + (p - p_min + 1)  # sorts by const, then param
+    starts, ends = np.sort(key(segments[:, 0], segments[:, 1])), np.sort(key(*segments[:, ::2].T))
+    line_start = key(consts, p_min - 1)
+    n_started = np.searchsorted(starts, key(consts, params), "right")
+    n_ended = np.searchsorted(ends, key(consts, params), "left")  # end < param
+    return (n_started - np.searchsorted(starts, line_start)) - (
+        n_ended - np.searchsorted(ends, line_start)
+    )
+
+
+def count_overlaps_sparse(segments: Segments, min_overlap: int = 2) -> int:
+    """
+    Number of points covered by >= min_overlap vent lines without a dense map, so it scales
+    with the number of vent lines instead of the extent of their coordinates:
+    * points where one family alone reaches min_overlap: sorted events per line
+    * all other points with several families involved are intersections of segments of
+      different families: their coverage is the sum of the families' coverages.
+      Intersections where 2+ families each reach min_overlap were counted more than once above
+    """
+    n_points = sum(_collinear_overlap_length(segments[f], min_overlap) for f in FAMILIES)
+    intersections = [np.zeros((0, 2), dtype=np.int64)]
+    for i, f1 in enumerate(FAMILIES):
+        for f2 in FAMILIES[i + 1 :]:
+            if len(segments[f1]) and len(segments[f2]):
+                intersections.append(_segment_intersections(f1, segments[f1], f2, segments[f2]))
+    x, y = np.unique(np.concatenate(intersections), axis=0).T
+    line_consts = {"h": (y, x), "v": (x, y), "d": (x - y, x), "a": (x + y, x)}
+    coverage = np.stack([_coverage_at(segments[f], *line_consts[f]) for f in FAMILIES])
+    n_families_reaching = (coverage >= min_overlap).sum(axis=0)
+    n_points += ((coverage.sum(axis=0) >= min_overlap) & (n_families_reaching == 0)).sum()
+    n_points -= np.maximum(n_families_reaching - 1, 0).sum()
+    return int(n_points)
+
+
+def count_overlaps(
+    path: Path, min_overlap: int = 2, no_diag_lines: bool = False, max_dense_bytes: int = 2**28
+) -> int:
+    """
+    Number of points with >= min_overlap vent lines. Uses the dense vent map if it fits into
+    max_dense_bytes, otherwise the sparse segment based counting
+    """
+    vent_lines = parse_vent_lines(path, no_diag_lines)
+    max_x, max_y = vent_lines[:, ::2].max(initial=0), vent_lines[:, 1::2].max(initial=0)
+    # bincount's int64 counts dominate the memory of the dense map
+    if (max_x + 1) * (max_y + 1) * 8 <= max_dense_bytes:
+        return int((rasterize(vent_lines) >= min_overlap).sum())
+    return count_overlaps_sparse(to_segments(vent_lines), min_overlap)
 
 
 if __name__ == "__main__":
@@ -44,10 +191,8 @@ if __name__ == "__main__":
     args = parser.parse_args()
     path = Path(args.i) if args.i else Path("example_input.txt")
     assert path.exists()
-    vent_map = get_vent_map(path, no_diag_lines=True)
-    vent_overlap = vent_map >= 2
-    print(f"Answer part 1 (no diagonal lines): {vent_overlap.sum()}")
+    n_overlaps = count_overlaps(path, no_diag_lines=True)
+    print(f"Answer part 1 (no diagonal lines): {n_overlaps}")
 
-    vent_map = get_vent_map(path)
-    vent_overlap = vent_map >= 2
-    print(f"Answer part 2 (with diagonal lines): {vent_overlap.sum()}")
+    n_overlaps = count_overlaps(path)
+    print(f"Answer part 2 (with diagonal lines): {n_overlaps}")
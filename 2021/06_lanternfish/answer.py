@@ -1,6 +1,9 @@
 import argparse
 from pathlib import Path
 from collections import defaultdict
+from typing import Optional
+
+import numpy as np
 
 
 def read_input_file(path: Path) -> list[int]:
@@ -9,42 +12,151 @@ def read_input_file(path: Path) -> list[int]:
     return list(map(int, input.split(",")))
 
 
+def matrix_power(matrix: np.ndarray, exponent: int, modulus: Optional[int] = None) -> np.ndarray:
+    """
+    Repeated squaring with exact integers (object dtype), reduced modulo `modulus` if given
+    """
+    result = np.identity(len(matrix), dtype=object)
+    while exponent:
+        if exponent & 1:
+            result = result.dot(matrix) if modulus is None else result.dot(matrix) % modulus
+        matrix = matrix.dot(matrix) if modulus is None else matrix.dot(matrix) % modulus
+        exponent >>= 1
+    return result
+
+
 class LanternfishSimulator:
     def __init__(
-        self, initial_state: list[int], timer_reset: int = 6, new_lanternfish_timer: int = 8
+        self,
+        initial_state: list[int],
+        timer_reset: int = 6,
+        new_lanternfish_timer: int = 8,
+        modulus: Optional[int] = None,
     ):
         self._timer_reset = timer_reset
         self._new_lf_timer = new_lanternfish_timer
         self._max_timer = max(timer_reset, new_lanternfish_timer)
+        self._modulus = modulus  # count lanternfishes modulo this number (huge populations)
         self.state = {timer: initial_state.count(timer) for timer in range(self._max_timer + 1)}
         self.day = 0
 
-    def simulate(self, days: int):
+    def transition_matrix(self) -> np.ndarray:
+        """
+        Matrix M with state vector (index = timer) of the next day = M @ state vector
+        """
+        matrix = np.zeros((self._max_timer + 1, self._max_timer + 1), dtype=object)
+        matrix[np.arange(self._max_timer), np.arange(1, self._max_timer + 1)] = 1  # timer - 1
+        matrix[self._timer_reset, 0] += 1
+        matrix[self._new_lf_timer, 0] += 1
+        return matrix
+
+    def simulate(self, days: int, method: str = "auto"):
+        """
+        method "daily": one update per day, "matrix": multiplies the state with the transition
+        matrix to the power of days (O(log days) matrix products), "auto": matrix for many days
+        """
+        if method == "auto":
+            method = "matrix" if days > 1000 else "daily"
         self.day += days
+        if method == "matrix":
+            state = np.array([self.state[t] for t in sorted(self.state)], dtype=object)
+            state = matrix_power(self.transition_matrix(), days, self._modulus).dot(state)
+            self.state = self._reduce(dict(enumerate(state)))
+            return
         for _ in range(days):
             n_resets = self.state[0]
             self.state = {
-                t: self.state[t + 1] if t < self._max_timer else n_resets
-                for t in self.state.keys()
+                t: self.state[t + 1] if t < self._max_timer else 0 for t in self.state.keys()
             }
             self.state[self._timer_reset] += n_resets
+            self.state[self._new_lf_timer] += n_resets
+            self.state = self._reduce(self.state)
+
+    def _reduce(self, state: dict[int, int]) -> dict[int, int]:
+        if self._modulus is None:
+            return state
+        return {t: n % self._modulus for t, n in state.items()}
 
     def size(self):
-        return sum(self.state.values())
+        n = sum(self.state.values())
+        return n if self._modulus is None else n % self._modulus
+
+
+class PopulationForecaster:
+    """
+    Sizes of many lanternfish populations (count matrix of shape (n_populations, n_timers)) at
+    many days at once: size after d days = counts @ (1 @ M^d). The transition matrix powers
+    M^(2^k) are computed once per forecaster and reused by all calls
+    """
+
+    def __init__(
+        self, timer_reset: int = 6, new_lanternfish_timer: int = 8, modulus: Optional[int] = None
+    ):
+        simulator = LanternfishSimulator([], timer_reset, new_lanternfish_timer, modulus)
+        self.n_timers = simulator._max_timer + 1
+        self._modulus = modulus
+        self._powers = [self._reduce(simulator.transition_matrix())]
+
+    def _reduce(self, x: np.ndarray) -> np.ndarray:
+        return x if self._modulus is None else x % self._modulus
+
+    def _power(self, k: int) -> np.ndarray:  # M^(2^k)
+        while len(self._powers) <= k:
+            self._powers.append(self._reduce(self._powers[-1].dot(self._powers[-1])))
+        return self._powers[k]
+
+    def counts(self, initial_states: list[list[int]]) -> np.ndarray:
+        """
+        Count matrix of lanternfish timer lists
+        """
+        counts = np.zeros((len(initial_states), self.n_timers), dtype=np.int64)
+        for idx, state in enumerate(initial_states):
+            counts[idx] = np.bincount(state, minlength=self.n_timers)
+        return counts
+
+    def _sizes(self, counts: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        # int64 if the sizes can't overflow it, exact Python ints otherwise
+        if int(weights.max()) * int(counts.sum(axis=1).max(initial=0)) < 2**63:
+            return self._reduce(counts.astype(np.int64).dot(weights.astype(np.int64)))
+        return self._reduce(counts.astype(object).dot(weights))
+
+    def sizes(self, counts: np.ndarray, days: list[int]) -> np.ndarray:
+        """
+        Population sizes of shape (n_populations, len(days)). The weights 1 @ M^d are advanced
+        from one query day to the next (sorted internally), the populations are only touched
+        by one matrix-vector product per day
+        """
+        counts = self._reduce(np.asarray(counts).reshape(-1, self.n_timers))
+        weights = np.ones(self.n_timers, dtype=object)  # weights of the timers' counts at day
+        sizes, day = [None] * len(days), 0
+        for idx in np.argsort(days, kind="stable"):
+            step, day = int(days[idx]) - day, int(days[idx])
+            if step < 0:
+                raise ValueError("Days have to be >= 0")
+            for k in range(step.bit_length()):
+                if step >> k & 1:
+                    weights = self._reduce(weights.dot(self._power(k)))
+            sizes[idx] = self._sizes(counts, weights)
+        return np.stack(sizes, axis=1) if sizes else np.zeros((len(counts), 0), dtype=np.int64)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Advent of Code - Day 6: Lanternfishes")
     parser.add_argument("-i", help="Input file path")
     parser.add_argument("-d", help="Simulate d days")
+    parser.add_argument("-m", type=int, help="Count lanternfishes modulo m")
+    parser.add_argument(
+        "--method", choices=("auto", "daily", "matrix"), default="auto", help="Simulation method"
+    )
     args = parser.parse_args()
     path = Path(args.i) if args.i else Path("example_input.txt")
     days = int(args.d) if args.d else 80
     assert path.exists()
 
     initial_state = read_input_file(path)
-    simulator = LanternfishSimulator(initial_state)
-    simulator.simulate(days=days)
+    simulator = LanternfishSimulator(initial_state, modulus=args.m)
+    simulator.simulate(days=days, method=args.method)
 
-    print(f"Number of lanternfishes after {simulator.day} days:")
+    modulo = f" (modulo {args.m})" if args.m else ""
+    print(f"Number of lanternfishes after {simulator.day} days{modulo}:")
     print(simulator.size())
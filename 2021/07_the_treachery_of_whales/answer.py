@@ -2,6 +2,8 @@ import argparse
 from pathlib import Path
 from typing import Callable
 
+import numpy as np
+
 
 def read_input_file(path: Path) -> list[int]:
     with open(path) as f:
@@ -10,16 +12,16 @@ def read_input_file(path: Path) -> list[int]:
 
 
 def alignment_cost_part1(init_positions: list[int], alignment_position: int) -> int:
-    return sum([abs(i - alignment_position) for i in init_positions])
+    return int(np.abs(np.asarray(init_positions) - alignment_position).sum())
 
 
-def triangular_number(n: int) -> int:
-    return int(n * (n + 1) / 2)
+def triangular_number(n: int) -> int:  # also works elementwise on arrays
+    return n * (n + 1) // 2
 
 
 def alignment_cost_part2(init_positions: list[int], alignment_position: int) -> int:
     # pos_delta=[0, 1, 2, 3, 4, 5 ...] --> cost=[0, 1, 3, 6, 10, 15]  --> triangular number :)
-    return sum([triangular_number(abs(i - alignment_position)) for i in init_positions])
+    return int(triangular_number(np.abs(np.asarray(init_positions) - alignment_position)).sum())
 
 
 def optimize_alignment_naive(cost_f: Callable, init_positions: list[int]) -> tuple[int, int]:
@@ -34,6 +36,85 @@ def optimize_alignment_naive(cost_f: Callable, init_positions: list[int]) -> tup
     return min(costs.items(), key=lambda x: x[1])
 
 
+def optimize_alignment_ternary(cost_f: Callable, init_positions: list[int]) -> tuple[int, int]:
+    """
+    Ternary search between min and max position for any convex cost function: O(log range)
+    cost function calls. Like the naive optimization, the smallest optimal position is returned
+    """
+    lo, hi = min(init_positions), max(init_positions)
+    while hi - lo > 2:
+        pos1, pos2 = lo + (hi - lo) // 3, hi - (hi - lo) // 3
+        if cost_f(init_positions, pos1) > cost_f(init_positions, pos2):
+            lo = pos1 + 1
+        else:  # on ties the (first) optimum can't be right of pos2
+            hi = pos2
+    costs = ((pos, cost_f(init_positions, pos)) for pos in range(lo, hi + 1))
+    return min(costs, key=lambda x: x[1])
+
+
+def optimize_alignment(cost_f: Callable, init_positions: list[int]) -> tuple[int, int]:
+    """
+    Optimize alignment cost function in closed form where possible:
+    * part 1 (sum of distances): the optimum is the median, found in O(n) by selection
+    * part 2 (sum of triangular numbers): the optimum is within 1/2 of the mean, so only the
+      positions around it are evaluated
+    * other (convex) cost functions: ternary search
+    Returns: Tuple[alignment_position, cost]
+    """
+    positions = np.asarray(init_positions)
+    if cost_f is alignment_cost_part1:
+        lower_median = (len(positions) - 1) // 2  # the first optimum if n is even
+        candidates = [int(np.partition(positions, lower_median)[lower_median])]
+    elif cost_f is alignment_cost_part2:
+        mean = positions.mean()
+        candidates = range(int(np.floor(mean)) - 1, int(np.ceil(mean)) + 2)
+        candidates = [c for c in candidates if positions.min() <= c <= positions.max()]
+    else:
+        return optimize_alignment_ternary(cost_f, init_positions)
+    return min(((pos, cost_f(positions, pos)) for pos in candidates), key=lambda x: x[1])
+
+
+class AlignmentCostIndex:
+    """
+    Prefix sums of counts, positions and squared positions over the sorted initial positions.
+    Both alignment costs are evaluated in O(log n) per alignment position (array or int):
+    * part 1: sum |x - p| = p * n_left - sum_left + sum_right - p * n_right
+    * part 2: sum (d^2 + |d|) / 2 with sum d^2 = sum x^2 - 2 p sum x + n p^2
+    """
+
+    def __init__(self, init_positions: list[int]):
+        self.positions = np.sort(np.asarray(init_positions, dtype=np.int64))
+        self.min, self.max = int(self.positions[0]), int(self.positions[-1])
+        self.n = len(self.positions)
+        self._sums = np.concatenate([[0], np.cumsum(self.positions)])
+        self.sum_sq = int((self.positions**2).sum())
+
+    def _costs(self, p: np.ndarray, n_left: np.ndarray, sum_left: np.ndarray, part: int):
+        sum_abs = p * n_left - sum_left + (self._sums[-1] - sum_left) - p * (self.n - n_left)
+        if part == 1:
+            return sum_abs
+        sum_sq = self.sum_sq - 2 * p * self._sums[-1] + self.n * p**2
+        return (sum_sq + sum_abs) // 2
+
+    def cost(self, alignment_positions, part: int):
+        p = np.asarray(alignment_positions, dtype=np.int64)
+        n_left = np.searchsorted(self.positions, p, side="right")  # initial positions <= p
+        costs = self._costs(p, n_left, self._sums[n_left], part)
+        return int(costs) if costs.ndim == 0 else costs
+
+    def cost_curve(self, part: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Costs of all alignment positions between min and max position in O(range + n): the
+        counts left of each position come from the cumulated histogram instead of searches
+        Returns: Tuple[alignment_positions, costs]
+        """
+        p = np.arange(self.min, self.max + 1)
+        histogram = np.bincount(self.positions - self.min)
+        n_left = np.cumsum(histogram)
+        sum_left = np.cumsum(histogram * p)
+        return p, self._costs(p, n_left, sum_left, part)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Advent of Code - Day 7: The Treachery of Whales")
     parser.add_argument("-i", help="Input file path")
@@ -42,8 +123,8 @@ if __name__ == "__main__":
     assert path.exists()
 
     init_positions = read_input_file(path)
-    alignment_pos, cost = optimize_alignment_naive(alignment_cost_part1, init_positions)
+    alignment_pos, cost = optimize_alignment(alignment_cost_part1, init_positions)
     print(f"Optimum Part1: Alignment position {alignment_pos}. Required fuel: {cost}")
 
-    alignment_pos, cost = optimize_alignment_naive(alignment_cost_part2, init_positions)
+    alignment_pos, cost = optimize_alignment(alignment_cost_part2, init_positions)
     print(f"Optimum Part2: Alignment position {alignment_pos}. Required fuel: {cost}")
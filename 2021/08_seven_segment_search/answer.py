@@ -2,6 +2,13 @@ import argparse
 from pathlib import Path
 from typing import Iterable
 
+import numpy as np
+
+
+DIGIT_SEGMENTS = (
+    "abcefg", "cf", "acdeg", "acdfg", "bcdf", "abdfg", "abdefg", "acf", "abcdefg", "abcdfg"
+)  # segments of the digits 0-9 with the original wiring
+
 
 def parse_input_file(path: Path) -> dict[tuple[str], tuple[str]]:
     displays = dict()  # dict[unique_signal_pattern, 4-digit-output]
@@ -121,6 +128,97 @@ class Digit7sDecoder:
         return int("".join(map(str, digits)))
 
 
+def to_mask(digit7s: str) -> int:
+    """
+    7-bit integer of a pattern's segments: a -> bit 0, ..., g -> bit 6
+    """
+    mask = 0
+    for segment in digit7s:
+        mask |= 1 << (ord(segment) - ord("a"))
+    return mask
+
+
+def segment_frequencies(masks: Iterable[int]) -> list[int]:
+    masks = list(masks)
+    return [sum(mask >> bit & 1 for mask in masks) for bit in range(7)]
+
+
+def signature(mask: int, frequencies: list[int]) -> int:
+    """
+    Sum of the segments' frequencies in all 10 patterns: invariant to the wiring of the segments
+    """
+    return sum(frequencies[bit] for bit in range(7) if mask >> bit & 1)
+
+
+_DIGIT_MASKS = [to_mask(digit7s) for digit7s in DIGIT_SEGMENTS]
+SIGNATURE_TO_DIGIT = {
+    signature(mask, segment_frequencies(_DIGIT_MASKS)): digit
+    for digit, mask in enumerate(_DIGIT_MASKS)
+}
+assert len(SIGNATURE_TO_DIGIT) == 10  # the signature identifies the digit
+
+
+class BitmaskDecoder:
+    """
+    Same interface as Digit7sDecoder: the 10 patterns are decoded by their signatures, decoding
+    an output is one dict lookup per digit
+    """
+
+    def __init__(self, unique_signal_pattern: tuple[str]):
+        assert len(unique_signal_pattern) == 10
+        masks = [to_mask(digit7s) for digit7s in unique_signal_pattern]
+        frequencies = segment_frequencies(masks)
+        self.mask_to_digit = {
+            mask: SIGNATURE_TO_DIGIT[signature(mask, frequencies)] for mask in masks
+        }
+
+    def __call__(self, digits7s: Iterable[str]) -> int:
+        number = 0
+        for digit7s in digits7s:
+            number = 10 * number + self.mask_to_digit[to_mask(digit7s)]
+        return number
+
+
+### Bulk decoding of all displays at once #########################################################
+SIGNATURE_LUT = np.full(7 * 10 + 1, -1)  # signature -> digit, for all possible signatures
+SIGNATURE_LUT[list(SIGNATURE_TO_DIGIT)] = list(SIGNATURE_TO_DIGIT.values())
+POPCOUNT = np.array([bin(mask).count("1") for mask in range(128)])
+BITS = np.arange(7, dtype=np.uint8)
+
+
+def parse_masks(path: Path) -> np.ndarray:
+    """
+    All displays (incl. duplicates) as uint8 array of shape (n_displays, 14): segment masks of
+    the 10 unique signal patterns followed by the 4 output digits
+    """
+    x = np.frombuffer(path.read_bytes(), dtype=np.uint8)
+    is_segment = (x >= ord("a")) & (x <= ord("g"))
+    pattern_starts = np.flatnonzero(is_segment & ~np.concatenate([[False], is_segment[:-1]]))
+    segment_bits = np.where(is_segment, np.left_shift(1, x - ord("a"), dtype=np.uint8), 0)
+    masks = np.bitwise_or.reduceat(segment_bits, pattern_starts)
+    if len(masks) % 14:
+        raise ValueError(f"{path} doesn't consist of displays with 10 patterns and 4 digits")
+    return masks.astype(np.uint8).reshape(-1, 14)
+
+
+def count_1s_4s_7s_bulk(masks: np.ndarray) -> int:
+    return int(np.isin(POPCOUNT[masks[:, 10:]], [2, 3, 4, 7]).sum())
+
+
+def decode_displays(masks: np.ndarray) -> np.ndarray:
+    """
+    Output values of all displays: the signature of each output digit is the sum of its
+    segments' frequencies in the display's 10 unique patterns
+    """
+    segments = (masks[:, :, None] >> BITS) & 1  # (n_displays, 14, 7)
+    frequencies = segments[:, :10].sum(axis=1, dtype=np.int64)  # (n_displays, 7)
+    signatures = (segments[:, 10:] * frequencies[:, None, :]).sum(axis=2)
+    digits = SIGNATURE_LUT[signatures]
+    if (digits < 0).any():
+        raise ValueError(f"Display {np.flatnonzero((digits < 0).any(axis=1))[0]} can't be decoded")
+    return digits @ np.array([1000, 100, 10, 1])
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Advent of Code - Day 8: Seven Segment Search")
     parser.add_argument("-i", help="Input file path")
@@ -128,13 +226,9 @@ if __name__ == "__main__":
     path = Path(args.i) if args.i else Path("example_input.txt")
     assert path.exists()
 
-    displays = parse_input_file(path)
-    n_1s_4s_7s = count_1s_4s_7s(displays)
+    masks = parse_masks(path)
+    n_1s_4s_7s = count_1s_4s_7s_bulk(masks)
     print(f"Part1: Number of digits 1, 4, 7: {n_1s_4s_7s}")
 
-    displays_sum = 0
-    for usp, four_digit7s_output in displays.items():
-        decoder = Digit7sDecoder(usp)
-        displays_sum += decoder(digits7s=four_digit7s_output)
-
+    displays_sum = decode_displays(masks).sum()
     print(f"Part2: Displays sum: {displays_sum}")
@@ -1,18 +1,31 @@
 import argparse
 import math
 from pathlib import Path
+import sys
+from typing import Optional
 
 import numpy as np
 from numpy import ndarray
-from scipy.ndimage import minimum_filter
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.grid import grid_shape, load_grid  # noqa: E402
+from utils.lazy import is_available, lazy_import  # noqa: E402
+
+futures = lazy_import("concurrent.futures")  # only used with several workers
+ndimage = lazy_import("scipy.ndimage")
 
 
 def parse_input_file(path: Path) -> ndarray:
-    rows = list()
-    with open(path) as f:
-        for line in f:
-            rows.append([int(x) for x in line if x.isnumeric()])
-    return np.array(rows, dtype=np.uint8)
+    return load_grid(path)
+
+
+def get_local_minima(height_map: ndarray) -> ndarray:
+    # minimum of the 4-connected neighbors, borders are mirrored (scipy.ndimage's mode="mirror")
+    padded = np.pad(height_map, 1, mode="reflect")
+    min_filtered = np.minimum.reduce(
+        [padded[:-2, 1:-1], padded[2:, 1:-1], padded[1:-1, :-2], padded[1:-1, 2:]]
+    )
+    return height_map < min_filtered
 
 
 def get_nearest_neighbor_locations(
@@ -70,25 +83,144 @@ def get_basins(height_map: ndarray, local_minima: ndarray) -> dict[tuple[int, in
     return basins
 
 
+### Basin engine: all basins (4-connected components of heights < 9) in one pass ##################
+def _union_find_roots(n: int, u: ndarray, v: ndarray) -> ndarray:
+    """
+    Root (smallest member) of every node 0..n-1 of the graph given by the edges u-v. Vectorized
+    union-find: roots are hooked onto the smaller root of their edges, followed by pointer
+    jumping, until no edge connects different roots
+    """
+    parent = np.arange(n, dtype=u.dtype)
+    while len(u):
+        root_u, root_v = parent[u], parent[v]
+        differ = root_u != root_v
+        u, v, root_u, root_v = u[differ], v[differ], root_u[differ], root_v[differ]
+        np.minimum.at(parent, np.maximum(root_u, root_v), np.minimum(root_u, root_v))
+        grandparent = parent[parent]
+        while (grandparent != parent).any():
+            parent, grandparent = grandparent, grandparent[grandparent]
+    return parent
+
+
+def _label_runs(in_basin: ndarray) -> tuple[ndarray, ndarray]:
+    """
+    Labels (1...) of the basins of the mask of heights < 9: cells are grouped into runs of
+    basin cells within a row, the runs are merged with union-find over vertically touching runs.
+    Returns: Tuple[run label map (0 = height 9), basin label of each run]
+    """
+    run_starts = in_basin.copy()
+    run_starts[:, 1:] &= ~in_basin[:, :-1]
+    runs = np.cumsum(run_starts, dtype=np.int32).reshape(in_basin.shape)
+    runs *= in_basin
+    touching = in_basin[:-1] & in_basin[1:]
+    first_touch = touching.copy()  # one edge per pair of touching runs
+    first_touch[:, 1:] &= ~touching[:, :-1]
+    n_runs = int(runs.max(initial=0))
+    roots = _union_find_roots(n_runs + 1, runs[:-1][first_touch], runs[1:][first_touch])
+    is_root = roots == np.arange(len(roots))
+    is_root[0] = False
+    basin_of_run = np.cumsum(is_root, dtype=np.int32)[roots]  # raster order like ndimage.label
+    basin_of_run[0] = 0
+    return runs, basin_of_run
+
+
+def label_basins(height_map: ndarray, use_scipy: Optional[bool] = None) -> tuple[ndarray, ndarray]:
+    """
+    All basins at once: int32 label map (0 = height 9, basins 1...) and basin sizes (index =
+    label - 1). Uses scipy.ndimage.label if available, the union-find over row runs otherwise.
+    Memory is O(height map), there is no per-basin array and no recursion
+    """
+    if use_scipy is None:
+        use_scipy = is_available("scipy")
+    if use_scipy:
+        labels, _ = ndimage.label(height_map < 9)
+    else:
+        runs, basin_of_run = _label_runs(height_map < 9)
+        labels = basin_of_run[runs]
+    return labels, np.bincount(labels.ravel())[1:]
+
+
+def get_basin_sizes(height_map: ndarray, use_scipy: Optional[bool] = None) -> ndarray:
+    """
+    Like label_basins, but without building the label map if scipy isn't used
+    """
+    if use_scipy or use_scipy is None and is_available("scipy"):
+        return label_basins(height_map, use_scipy=True)[1]
+    runs, basin_of_run = _label_runs(height_map < 9)
+    return np.bincount(basin_of_run, weights=np.bincount(runs.ravel()))[1:].astype(np.int64)
+
+
+### Tiled processing of height maps larger than the memory ########################################
+BandResult = tuple[int, ndarray, ndarray, ndarray]  # risk level sum, basin sizes, seam rows
+
+
+def _process_band(path: Path, row_start: int, row_stop: int) -> BandResult:
+    """
+    Low points and basins of one band of rows. The band is loaded with a one row halo above and
+    below, so the low points at its borders see the same neighbors as in the whole map
+    """
+    halo_start = max(row_start - 1, 0)
+    height_map = load_grid(path, row_range=(halo_start, row_stop + 1))
+    local_minima = get_local_minima(height_map)[row_start - halo_start :][: row_stop - row_start]
+    height_map = height_map[row_start - halo_start :][: row_stop - row_start]
+    risk_level_sum = int((height_map.astype(np.int64) + 1)[local_minima].sum())
+    labels, sizes = label_basins(height_map)
+    return risk_level_sum, sizes, labels[0].copy(), labels[-1].copy()
+
+
+def analyze_tiled(path: Path, band_rows: int = 4096, n_workers: int = 1) -> tuple[int, ndarray]:
+    """
+    Sum of the risk levels and basin sizes (in the same order as label_basins) of a height map
+    file, processed in bands of rows which can run in a process pool. The basins of the bands
+    are merged with a union-find over the labels touching across the seams between bands.
+    Returns: Tuple[risk level sum, basin sizes]
+    """
+    n_rows, _ = grid_shape(path)
+    bands = [(path, start, min(start + band_rows, n_rows)) for start in range(0, n_rows, band_rows)]
+    if n_workers > 1:
+        with futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(_process_band, *zip(*bands)))
+    else:
+        results = [_process_band(*band) for band in bands]
+
+    # global labels: band offset + band label (0 = height 9 in all bands)
+    offsets = np.cumsum([0] + [len(sizes) for _, sizes, _, _ in results])
+    u, v = [], []
+    for idx in range(len(results) - 1):
+        bottom, top = results[idx][3], results[idx + 1][2]
+        touching = (bottom > 0) & (top > 0)
+        u.append(bottom[touching].astype(np.int64) + offsets[idx])
+        v.append(top[touching].astype(np.int64) + offsets[idx + 1])
+    edges = np.stack([np.concatenate(u or [[]]), np.concatenate(v or [[]])]).astype(np.int64)
+    roots = _union_find_roots(int(offsets[-1]) + 1, *np.unique(edges, axis=1))
+    sizes = np.concatenate([[0]] + [sizes for _, sizes, _, _ in results])
+    sizes = np.bincount(roots, weights=sizes, minlength=len(roots))
+    is_root = roots == np.arange(len(roots))
+    is_root[0] = False
+    return sum(r for r, _, _, _ in results), sizes[is_root].astype(np.int64)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Advent of Code - Day 9: Smoke Basin")
     parser.add_argument("-i", help="Input file path")
+    parser.add_argument("-b", type=int, help="Process the height map in bands of b rows")
+    parser.add_argument("-w", type=int, default=1, help="Number of processes for the bands")
     args = parser.parse_args()
     path = Path(args.i) if args.i else Path("example_input.txt")
     assert path.exists()
 
-    height_map = parse_input_file(path)
+    if args.b:
+        local_minima_sum, basin_sizes = analyze_tiled(path, band_rows=args.b, n_workers=args.w)
+    else:
+        height_map = parse_input_file(path)
+        local_minima = get_local_minima(height_map)
+        local_minima_sum = (height_map + 1)[local_minima].sum()
+        basin_sizes = get_basin_sizes(height_map)
 
     # Part 1
-    footprint = np.array([[False, True, False], [True, False, True], [False, True, False]], bool)
-    min_filtered = minimum_filter(height_map, mode="mirror", footprint=footprint)
-    local_minima = height_map < min_filtered
-    local_minima_sum = (height_map + 1)[local_minima].sum()
     print(f"Answer part 1 - Sum of local minima of height map: {local_minima_sum}")
 
     # Part 2
-    basins = get_basins(height_map, local_minima)
-    basins_size = {k: v.sum() for k, v in basins.items()}
-    basins_size = {k: v for k, v in sorted(basins_size.items(), key=lambda x: x[1])[::-1]}
-    summed_size_of_3_largest_basin = math.prod(list(basins_size.values())[:3])
+    basins_size = np.sort(basin_sizes)[::-1]
+    summed_size_of_3_largest_basin = math.prod(basins_size[:3].tolist())
     print(f"Answer part 2 - Sum of size of 3 largest basins: {summed_size_of_3_largest_basin}")
@@ -1,16 +1,26 @@
 import argparse
+from array import array
 from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.chunks import chunk_boundaries  # noqa: E402
+from utils.lazy import lazy_import  # noqa: E402
+
+futures = lazy_import("concurrent.futures")  # only used with several workers
+np = lazy_import("numpy")  # only needed for the median of many scores
 
 
 def resolve_chunks(
     line: str, close_open_chars: dict[str, str] = {")": "(", "]": "[", "}": "{", ">": "<"}
 ) -> list[str] | str:  # empty/non-empty list ... complete/incomplete line, str ... erronous char
     line_open_chars = list()
+    open_chars = set(close_open_chars.values())
     for c in line:
-        if c in list(close_open_chars.values()):
+        if c in open_chars:
             line_open_chars.append(c)
-        elif c in list(close_open_chars.keys()):
-            if close_open_chars[c] == line_open_chars[-1]:
+        elif c in close_open_chars:
+            if line_open_chars and close_open_chars[c] == line_open_chars[-1]:
                 line_open_chars.pop()
             else:
                 return c  # error --> return char with erronous closing symbol
@@ -21,31 +31,148 @@ def score_erronous_chars(erronous_chars: list[str]) -> int:
     return sum([{")": 3, "]": 57, "}": 1197, ">": 25137}[c] for c in erronous_chars])
 
 
-def score_autocompletion(non_closed_open_chars: list[str]) -> int:
+def score_autocompletion(
+    non_closed_open_chars: list[str], points: dict[str, int] = {"(": 1, "[": 2, "{": 3, "<": 4}
+) -> int:
     score = 0
     for c in reversed(non_closed_open_chars):
-        score = (score * 5) + {"(": 1, "[": 2, "{": 3, "<": 4}[c]
+        score = (score * 5) + points[c]
     return score
 
 
+class ScoreBuffer:
+    """
+    Autocompletion scores stored as 8 byte unsigned ints (array "Q") instead of a list of
+    Python ints. The rare scores >= 2^64 (lines with > 27 open chars) are kept in a list.
+    The median of many scores is selected in linear time instead of sorting all scores
+    """
+
+    SELECT_MIN_SIZE = 2**16  # below: sorting is faster than importing numpy
+
+    def __init__(self):
+        self.small = array("Q")
+        self.large: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.small) + len(self.large)
+
+    def append(self, score: int):
+        if score < 2**64:
+            self.small.append(score)
+        else:
+            self.large.append(score)
+
+    def extend(self, other: "ScoreBuffer"):
+        self.small.extend(other.small)
+        self.large.extend(other.large)
+
+    def median(self) -> int:
+        """
+        Middle score of the sorted scores (index n // 2 like the original sorted list)
+        """
+        if not len(self):
+            raise ValueError("No autocompletion scores")
+        k = len(self) // 2
+        if k >= len(self.small):  # all large scores are larger than the small ones
+            return sorted(self.large)[k - len(self.small)]
+        if len(self.small) < self.SELECT_MIN_SIZE:
+            return sorted(self.small)[k]
+        small = np.frombuffer(self.small, dtype=np.uint64).copy()
+        return int(np.partition(small, k)[k])  # introselect
+
+
+### Table-driven validation of the raw bytes ######################################################
+# byte -> 1..4 for the opening chars "([{<" (= their autocompletion points), 5..8 for the
+# matching closing chars, 0 for all other bytes (ignored like in resolve_chunks)
+CHAR_TABLE = bytearray(256)
+for kind, (open_char, close_char) in enumerate(zip(b"([{<", b")]}>"), start=1):
+    CHAR_TABLE[open_char], CHAR_TABLE[close_char] = kind, kind + 4
+ERROR_POINTS = (0, 3, 57, 1197, 25137)  # index = kind of the erronous closing char
+
+
+def score_lines(data: bytes) -> tuple[int, ScoreBuffer]:
+    """
+    Validates a batch of lines (bytes of complete lines) with the byte table and one
+    preallocated stack of the open kinds.
+    Returns: Tuple[syntax error score, autocompletion scores of the not corrupted lines]
+    """
+    error_score, ac_scores = 0, ScoreBuffer()
+    stack = bytearray(256)
+    lines = data.split(b"\n")
+    if lines[-1] == b"":  # the file's last line break
+        lines.pop()
+    for line in lines:
+        depth = 0
+        for byte in line:
+            kind = CHAR_TABLE[byte]
+            if not kind:
+                continue
+            if kind <= 4:
+                if depth == len(stack):
+                    stack.extend(bytes(depth))
+                stack[depth] = kind
+                depth += 1
+            elif depth and stack[depth - 1] == kind - 4:
+                depth -= 1
+            else:
+                error_score += ERROR_POINTS[kind - 4]
+                break
+        else:
+            score = 0
+            for idx in range(depth - 1, -1, -1):
+                score = score * 5 + stack[idx]
+            ac_scores.append(score)
+    return error_score, ac_scores
+
+
+def _score_chunk(path: Path, start: int, end: int, batch_size: int) -> tuple[int, ScoreBuffer]:
+    error_score, ac_scores = 0, ScoreBuffer()
+    rest = b""
+    with open(path, "rb") as f:
+        f.seek(start)
+        while start < end:
+            block = f.read(min(batch_size, end - start))
+            start += len(block)
+            lines, newline, rest = (rest + block).rpartition(b"\n")  # incomplete -> next block
+            if newline:
+                e, ac = score_lines(lines + newline)
+                error_score += e
+                ac_scores.extend(ac)
+    e, ac = score_lines(rest)
+    ac_scores.extend(ac)
+    return error_score + e, ac_scores
+
+
+def score_file(
+    path: Path, n_workers: int = 1, batch_size: int = 2**22
+) -> tuple[int, ScoreBuffer]:
+    """
+    Streams a file in batches of lines, with several workers each file chunk (split at line
+    breaks) is scored in its own process. Only the compact autocompletion scores are kept.
+    Returns: Tuple[syntax error score, autocompletion scores]
+    """
+    chunks = chunk_boundaries(path, n_workers)
+    if n_workers > 1:
+        with futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+            args = zip(*[(path, *chunk, batch_size) for chunk in chunks])
+            results = list(executor.map(_score_chunk, *args))
+    else:
+        results = [_score_chunk(path, *chunk, batch_size) for chunk in chunks]
+    ac_scores = ScoreBuffer()
+    for _, ac in results:
+        ac_scores.extend(ac)
+    return sum(e for e, _ in results), ac_scores
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Advent of Code - Day 10: Syntax Scoring")
     parser.add_argument("-i", help="Input file path")
+    parser.add_argument("-w", type=int, default=1, help="Number of processes")
     args = parser.parse_args()
     path = Path(args.i) if args.i else Path("example_input.txt")
     assert path.exists()
 
-    with open(path) as f:
-        erronous_chars, ac_score = list(), list()
-        for line in f:
-            residual = resolve_chunks(line)
-            if isinstance(residual, str):  # part 1
-                erronous_chars.append(residual)
-            elif isinstance(residual, list):  # part 2
-                ac_score.append(score_autocompletion(residual))
-
-    error_score = score_erronous_chars(erronous_chars)
+    error_score, ac_score = score_file(path, n_workers=args.w)
     print(f"Answer part 1: Syntax Error Score: {error_score}")
 
-    ac_score = sorted(ac_score)
-    print(f"Answer part 2: Autocompletion Score: {ac_score[int(len(ac_score)/2)]}")
+    print(f"Answer part 2: Autocompletion Score: {ac_score.median()}")
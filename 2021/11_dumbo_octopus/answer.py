@@ -1,16 +1,16 @@
 import argparse
 from pathlib import Path
+import sys
 
 from numpy import ndarray
 import numpy as np
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.grid import load_grid  # noqa: E402
+
 
 def parse_input_file(path: Path) -> ndarray:
-    rows = list()
-    with open(path) as f:
-        for line in f:
-            rows.append([int(x) for x in line if x.isnumeric()])
-    return np.array(rows, dtype=np.uint8)
+    return load_grid(path)
 
 
 def get_nearest_neighbors_8c(
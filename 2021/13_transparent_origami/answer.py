@@ -1,9 +1,14 @@
 import argparse
 from pathlib import Path
+import sys
 
-import cv2
 import numpy as np
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.lazy import is_available, lazy_import  # noqa: E402
+
+cv2 = lazy_import("cv2")
+
 
 Folds = list[tuple[str, int]]
 
@@ -51,4 +56,7 @@ if __name__ == "__main__":
     print(f"Answer part 1: # dots visible: {folded_paper.sum()}")
 
     folded_paper = fold_paper(paper, folds)
-    cv2.imwrite("answer_p2_code.png", folded_paper.astype(np.uint8) * 255)
+    if is_available("cv2"):
+        cv2.imwrite("answer_p2_code.png", folded_paper.astype(np.uint8) * 255)
+    else:
+        print("\n".join("".join("#" if dot else " " for dot in row) for row in folded_paper))
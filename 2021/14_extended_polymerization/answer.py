@@ -29,8 +29,8 @@ class PolymerPairRepr:
     def __init__(self, polymer_template: str):
         self.polymer_template = polymer_template
         self.pair_occ = defaultdict(lambda: 0)
-        for idx in range(len(polymer) - 1):
-            self.pair_occ[polymer[idx : idx + 2]] += 1
+        for idx in range(len(polymer_template) - 1):
+            self.pair_occ[polymer_template[idx : idx + 2]] += 1
 
     def insert(self, insertion_rules: InsertionRules, iters: int = 1):
         for _ in range(iters):
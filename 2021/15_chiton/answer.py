@@ -1,21 +1,21 @@
 import argparse
 from heapq import heappush, heappop
 from pathlib import Path
+import sys
 import time
 from typing import Optional
 
 import numpy as np
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.grid import load_grid  # noqa: E402
+
 
 Node = tuple[int, int]
 
 
 def parse_input_file(path: Path) -> np.ndarray:
-    rows = list()
-    with open(path) as f:
-        for line in f:
-            rows.append([int(x) for x in line if x.isnumeric()])
-    return np.array(rows, dtype=np.uint8)
+    return load_grid(path)
 
 
 def incr_array(array: np.ndarray, incr: int = 1, min_val: int = 1, max_val: int = 9) -> np.ndarray:
@@ -2,8 +2,12 @@ import argparse
 from dataclasses import dataclass
 from pathlib import Path
 import re
+import sys
 
-import numpy as np
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.lazy import lazy_import  # noqa: E402
+
+np = lazy_import("numpy")
 
 
 @dataclass
@@ -1,9 +1,13 @@
 import argparse
 import copy
 from pathlib import Path
+import sys
 
 import numpy as np
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.grid import load_grid  # noqa: E402
+
 
 ImgEnhAlgorithm = dict[np.ndarray, bool]
 
@@ -13,19 +17,12 @@ def np_to_tuple(np_ndarray: np.ndarray) -> tuple[tuple[bool, ...], ...]:
 
 
 def parse_input_file(file_path: Path) -> tuple[ImgEnhAlgorithm, np.ndarray]:
-    decode_line = lambda line: tuple(True if c == "#" else False for c in line)
     with open(file_path) as f:
-        rows = list()
-        for idx, line in enumerate(f):
-            line = line.strip()
-            if idx == 0:
-                iea = decode_line(line)
-            elif len(line):
-                rows.append(decode_line(line))
+        iea = tuple(True if c == "#" else False for c in f.readline().strip())
     return {
         np_to_tuple(np.array(list(map(int, bin(i)[2:].zfill(9)))).reshape(3, 3) > 0): b
         for i, b in enumerate(iea)
-    }, np.array(rows)
+    }, load_grid(file_path, ".#", skip_lines=2).astype(bool)
 
 
 def enhance_image(
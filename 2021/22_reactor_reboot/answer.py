@@ -3,8 +3,12 @@ import copy
 from math import prod
 import re
 from pathlib import Path
+import sys
 
-import numpy as np
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.lazy import lazy_import  # noqa: E402
+
+np = lazy_import("numpy")
 
 
 Rectangle = list[tuple[int, int]]  # Rectangles of any dimension: 3-dim -> Cube
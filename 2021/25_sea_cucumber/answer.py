@@ -1,32 +1,35 @@
 import argparse
 from pathlib import Path
+import sys
 
-import torch
-from torch import Tensor
+import numpy as np
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # make 2021/utils importable
+from utils.grid import load_grid  # noqa: E402
+from utils.lazy import lazy_import  # noqa: E402
 
-def parse_input(file_path: Path) -> Tensor:
-    items = []
-    with open(file_path) as f:
-        for line in f:
-            row_int = line.strip().replace(".", "0").replace(">", "1").replace("v", "2")
-            items.append([int(c) for c in row_int])
-    return torch.tensor(items, dtype=torch.uint8)
+torch = lazy_import("torch")
 
 
-def step(items: Tensor, east: bool) -> Tensor:
+def parse_input(file_path: Path, use_torch: bool = False) -> np.ndarray:  # or torch.Tensor
+    items = load_grid(file_path, ".>v")  # empty: 0, east-facing: 1, south-facing: 2
+    return torch.from_numpy(items) if use_torch else items
+
+
+def step(items: np.ndarray, east: bool) -> np.ndarray:
+    xp = np if isinstance(items, np.ndarray) else torch  # same API for roll and logical ops
     moving_idx = 1 if east else 2
     frozen_idx = 2 if east else 1
     axis = 1 if east else 0
 
     free = items == 0
     moving = items == moving_idx
-    desired = torch.roll(moving, 1, axis)
-    accepted = torch.logical_and(desired, free)
-    rejected = torch.logical_and(desired, ~accepted)
-    rejected = torch.roll(rejected, -1, axis)
-    new_moving = torch.logical_or(accepted, rejected)
-    new_items = torch.zeros(items.shape, dtype=torch.uint8)
+    desired = xp.roll(moving, 1, axis)
+    accepted = xp.logical_and(desired, free)
+    rejected = xp.logical_and(desired, ~accepted)
+    rejected = xp.roll(rejected, -1, axis)
+    new_moving = xp.logical_or(accepted, rejected)
+    new_items = xp.zeros(items.shape, dtype=xp.uint8)
     new_items[items == frozen_idx] = frozen_idx
     new_items[new_moving > 0] = moving_idx
     return new_items
@@ -35,17 +38,18 @@ def step(items: Tensor, east: bool) -> Tensor:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Advent of Code - Day 25: Sea cucumber")
     parser.add_argument("-i", help="Input file path")
+    parser.add_argument("--torch", action="store_true", help="Use torch instead of numpy")
     args = parser.parse_args()
     file_path = Path(args.i) if args.i else Path("example_input.txt")
     assert file_path.exists()
 
-    array = parse_input(file_path)
+    array = parse_input(file_path, use_torch=args.torch)
     print(array)
     for idx in range(10000):
-        array_ = array.clone()
+        array_ = array  # step doesn't modify its input
         array = step(array, east=True)
         array = step(array, east=False)
-        if torch.equal(array, array_):
+        if (array == array_).all():
             print(array)
             print(f"No change after {idx + 1} steps")
             break
@@ -0,0 +1,162 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import resource
+import tempfile
+import time
+import tracemalloc
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from utils.days import DAYS, YEAR_DIR, load_module
+
+
+Scaler = Callable[[str, int], str]  # (shipped input, scale factor) -> synthetic input
+
+
+def repeat_lines(head: int = 0) -> Scaler:
+    """
+    Keep the first `head` lines (e.g. a header) and repeat all remaining lines
+    """
+
+    def scale(text: str, factor: int) -> str:
+        lines = text.splitlines()
+        return "\n".join(lines[:head] + lines[head:] * factor)
+
+    return scale
+
+
+def repeat_csv(text: str, factor: int) -> str:
+    return ",".join([text.strip()] * factor)
+
+
+def scale_dots_keep_folds(text: str, factor: int) -> str:
+    dots, folds = text.split("\n\n")
+    return "\n\n".join(["\n".join([dots] * factor), folds])
+
+
+def scale_template_keep_rules(text: str, factor: int) -> str:
+    template, rules = text.split("\n", 1)
+    return "\n".join([template * factor, rules])
+
+
+# Days without a scaler have inputs of fixed size (a single number, a program, a start state ...)
+# and are benchmarked on the shipped input for every scale factor
+SCALERS: dict[str, Optional[Scaler]] = {
+    "01_sonar_sweep": repeat_lines(),
+    "02_dive": repeat_lines(),
+    "03_binary_diagnostics": repeat_lines(),
+    "04_giant_squid": repeat_lines(head=1),  # bingo sequence, then boards
+    "05_hydrothermal_venture": repeat_lines(),
+    "06_lanternfish": repeat_csv,
+    "07_the_treachery_of_whales": repeat_csv,
+    "08_seven_segment_search": repeat_lines(),
+    "09_smoke_basin": repeat_lines(),
+    "10_syntax_scoring": repeat_lines(),
+    "11_dumbo_octopus": repeat_lines(),
+    "12_passage_pathing": None,
+    "13_transparent_origami": scale_dots_keep_folds,
+    "14_extended_polymerization": scale_template_keep_rules,
+    "15_chiton": repeat_lines(),
+    "16_packet_decoder": None,
+    "17_trick_shot": None,
+    "18_snailfish": repeat_lines(),
+    "19_beacon_scanner": None,
+    "20_trench_map": repeat_lines(head=2),  # enhancement algorithm and empty line, then image
+    "21_dirac_dice": None,
+    "22_reactor_reboot": repeat_lines(),
+    "23_amphipod": None,
+    "24_alu": None,
+    "25_sea_cucumber": repeat_lines(),
+}
+
+
+def get_input(day: str, scale: int, tmp_dir: Path) -> Path:
+    shipped_input = YEAR_DIR / day / "input.txt"
+    scaler = SCALERS[day]
+    if scale == 1 or scaler is None:
+        return shipped_input
+    path = tmp_dir / f"{day}_x{scale}.txt"
+    path.write_text(scaler(shipped_input.read_text(), scale))
+    return path
+
+
+def measure(day: str, part: int, path: Path, trace_allocations: bool, conn: Connection):
+    """
+    Runs in a fresh process, so peak RSS and import time only belong to the measured solver
+    """
+    record: dict[str, Any] = dict()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            load_module(day, DAYS[day].modules[part - 1])
+            record["import_s"] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            record["answer"] = DAYS[day].solve(part, path)
+            record["wall_s"] = time.perf_counter() - t0
+            record["peak_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+            if trace_allocations:  # second run, tracemalloc slows down the solver considerably
+                tracemalloc.start()
+                DAYS[day].solve(part, path)
+                record["peak_alloc_bytes"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+    except Exception as e:
+        record["error"] = repr(e)
+    conn.send(record)
+
+
+def benchmark(
+    days: list[str], scales: list[int], timeout: float, trace_allocations: bool
+) -> list[dict[str, Any]]:
+    ctx = multiprocessing.get_context("spawn")
+    records = list()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for day in days:
+            # days without scaler always solve the shipped input: measure it once
+            for scale in scales if SCALERS[day] is not None else [1]:
+                path = get_input(day, scale, Path(tmp_dir))
+                for part in (1, 2):
+                    record = {
+                        "day": day,
+                        "part": part,
+                        "scale": scale,
+                        "input_bytes": DAYS[day].input_path(part, path).stat().st_size,
+                    }
+                    recv_conn, send_conn = ctx.Pipe(duplex=False)
+                    process = ctx.Process(
+                        target=measure, args=(day, part, path, trace_allocations, send_conn)
+                    )
+                    process.start()
+                    if recv_conn.poll(timeout):
+                        record.update(recv_conn.recv())
+                    else:
+                        record["error"] = f"Timeout after {timeout}s"
+                        process.terminate()
+                    process.join()
+                    records.append(record)
+    return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Advent of Code 2021 - Benchmark all solvers on scaled up inputs"
+    )
+    parser.add_argument("-d", nargs="+", help="Days to benchmark, e.g. -d 01 15 (default: all)")
+    parser.add_argument("-s", nargs="+", type=int, default=[1, 10, 100], help="Scale factors")
+    parser.add_argument("-t", type=float, default=600, help="Timeout per day and part in s")
+    parser.add_argument("-o", help="Output JSON file path (default: stdout)")
+    parser.add_argument("--no-alloc", action="store_true", help="Skip allocation tracing")
+    args = parser.parse_args()
+    days = [d for d in DAYS if args.d is None or d[:2] in args.d]
+
+    records = benchmark(days, args.s, args.t, trace_allocations=not args.no_alloc)
+    output = json.dumps(records, indent=2, default=str)
+    if args.o:
+        Path(args.o).write_text(output)
+    else:
+        print(output)
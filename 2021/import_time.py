@@ -0,0 +1,69 @@
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from utils.days import DAYS, YEAR_DIR
+
+
+def top_level_import_times(script: Path) -> dict[str, int]:
+    """
+    Runs the script's module level code (no __main__ block) with `python -X importtime` and
+    returns the cumulative import time in us of every top level import
+    """
+    code = f"import runpy; runpy.run_path({str(script)!r}, run_name='import_time')"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    import_times = dict()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line.split("|")
+        if package.startswith("  "):  # nested import, already part of its parent's time
+            continue
+        import_times[package.strip()] = int(cumulative)
+    return import_times
+
+
+def import_time_report(days: list[str], top: int = 5) -> list[dict]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        empty_script = Path(tmp_dir) / "empty.py"
+        empty_script.touch()
+        interpreter_imports = top_level_import_times(empty_script)
+
+    report = list()
+    for day in days:
+        for module in sorted(set(DAYS[day].modules)):
+            record = {"day": day, "module": module}
+            t0 = time.perf_counter()
+            try:
+                import_times = top_level_import_times(YEAR_DIR / day / f"{module}.py")
+            except RuntimeError as e:
+                record["error"] = str(e)
+                report.append(record)
+                continue
+            record["startup_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            day_imports = {k: v for k, v in import_times.items() if k not in interpreter_imports}
+            record["imports_ms"] = round(sum(day_imports.values()) / 1000, 1)
+            record["heaviest_ms"] = {
+                k: round(v / 1000, 1)
+                for k, v in sorted(day_imports.items(), key=lambda x: x[1], reverse=True)[:top]
+            }
+            report.append(record)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Advent of Code 2021 - Import time of every day's solver module"
+    )
+    parser.add_argument("-d", nargs="+", help="Days to report, e.g. -d 09 25 (default: all)")
+    args = parser.parse_args()
+    days = [d for d in DAYS if args.d is None or d[:2] in args.d]
+    print(json.dumps(import_time_report(days), indent=2))
@@ -0,0 +1,107 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from utils.cache import AnswerCache, answer_key
+from utils.days import DAYS, YEAR_DIR, discover_days
+
+
+@dataclass
+class Result:
+    day: str
+    part: int
+    answer: Any = None
+    wall_s: Optional[float] = None
+    error: Optional[str] = None
+    cached: bool = False
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError
+
+
+def solve(day: str, part: int, path: Path, timeout: Optional[float], use_cache: bool) -> Result:
+    """
+    Worker function: the timeout is enforced inside the worker with SIGALRM, so a slow day
+    doesn't block its pool process after its deadline
+    """
+    result = Result(day, part)
+    if day not in DAYS:
+        result.error = "No solver registered in utils/days.py"
+        return result
+    try:
+        if use_cache:  # hashing a missing input fails here, which only fails this day
+            cache = AnswerCache()
+            key = answer_key(
+                day, part, DAYS[day].input_path(part, path), DAYS[day].source_paths(part)
+            )
+            result.cached, result.answer = cache.get(key)
+            if result.cached:
+                return result
+        if timeout:
+            signal.signal(signal.SIGALRM, _raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # some solvers print progress
+            result.answer = DAYS[day].solve(part, path)
+        result.wall_s = time.perf_counter() - t0
+        if use_cache:
+            cache.put(key, result.answer)
+    except TimeoutError:
+        result.error = f"Timeout after {timeout}s"
+    except Exception as e:
+        result.error = repr(e)
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return result
+
+
+def run_all(
+    days: list[str],
+    input_name: str,
+    timeout: Optional[float],
+    max_workers: Optional[int],
+    use_cache: bool = True,
+) -> list[Result]:
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(solve, day, part, YEAR_DIR / day / input_name, timeout, use_cache)
+            for day in days
+            for part in (1, 2)
+        ]
+        results = [future.result() for future in as_completed(futures)]
+    return sorted(results, key=lambda r: (r.day, r.part))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Advent of Code 2021 - Solve all puzzles")
+    parser.add_argument("-d", nargs="+", help="Days to solve, e.g. -d 01 15 (default: all)")
+    parser.add_argument("-i", default="input.txt", help="Input file name inside each day's dir")
+    parser.add_argument("-t", type=float, help="Timeout per day and part in s")
+    parser.add_argument("-w", type=int, default=os.cpu_count(), help="Number of processes")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Don't use the answer cache")
+    args = parser.parse_args()
+    days = [d for d in discover_days() if args.d is None or d[:2] in args.d]
+
+    t0 = time.perf_counter()
+    results = run_all(days, args.i, args.t, args.w, use_cache=not args.no_cache)
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2, default=str))
+    else:
+        for r in results:
+            if r.error:
+                outcome = f"ERROR: {r.error}"
+            else:
+                outcome = f"{r.answer} ({'cached' if r.cached else f'{r.wall_s:.3f}s'})"
+            print(f"{r.day} part {r.part}: {outcome}")
+        print(f"Solved {len(days)} days in {time.perf_counter() - t0:.3f}s")
@@ -0,0 +1,74 @@
+import contextlib
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[1] / ".answer_cache.sqlite3"
+
+
+def answer_key(
+    day: str,
+    part: int,
+    input_path: Path,
+    source_paths: list[Path],
+    params: Optional[dict] = None,
+) -> str:
+    """
+    Cache key of an answer: changes whenever the input, the solver's sources (the day's modules
+    and the shared utils) or a parameter (e.g. the number of simulated days) changes, which
+    invalidates the cached answer
+    """
+    key = hashlib.sha256()
+    for path in (input_path, *source_paths):
+        key.update(hashlib.sha256(path.read_bytes()).digest())
+    key.update(json.dumps([day, part, params or {}], sort_keys=True).encode())
+    return key.hexdigest()
+
+
+class AnswerCache:
+    """
+    On-disk answer cache (sqlite in WAL mode, so several solver processes can read and write it
+    at once). If the stored answers exceed max_bytes, the least recently used ones are evicted
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = 16 * 2**20):
+        self.path = path
+        self.max_bytes = max_bytes
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS answers "
+                "(key TEXT PRIMARY KEY, answer TEXT NOT NULL, size INTEGER, last_used REAL)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        with contextlib.closing(sqlite3.connect(self.path, timeout=30)) as con:
+            with con:  # commit or rollback
+                yield con
+
+    def get(self, key: str) -> tuple[bool, Any]:  # (hit, answer)
+        with self._connect() as con:
+            row = con.execute("SELECT answer FROM answers WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False, None
+            con.execute("UPDATE answers SET last_used = ? WHERE key = ?", (time.time(), key))
+        return True, json.loads(row[0])
+
+    def put(self, key: str, answer: Any):
+        answer_json = json.dumps(answer)
+        with self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)",
+                (key, answer_json, len(key) + len(answer_json), time.time()),
+            )
+            # evict least recently used answers beyond max_bytes
+            con.execute(
+                "DELETE FROM answers WHERE key IN (SELECT key FROM (SELECT key, SUM(size) "
+                "OVER (ORDER BY last_used DESC) AS total FROM answers) WHERE total > ?)",
+                (self.max_bytes,),
+            )
@@ -0,0 +1,16 @@
+from pathlib import Path
+
+
+def chunk_boundaries(path: Path, n_chunks: int) -> list[tuple[int, int]]:
+    """
+    Splits the file into byte ranges of approx. equal size which end at line breaks
+    """
+    size = path.stat().st_size
+    boundaries = [0]
+    with open(path, "rb") as f:
+        for idx in range(1, n_chunks):
+            f.seek(max(boundaries[-1], idx * size // n_chunks))
+            f.readline()  # move to the next line start
+            boundaries.append(min(f.tell(), size))
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries[:-1], boundaries[1:]) if end > start]
@@ -0,0 +1,333 @@
+import importlib.util
+import itertools
+import math
+import sys
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+
+YEAR_DIR = Path(__file__).resolve().parents[1]
+
+PartSolver = Callable[[ModuleType, Path], Any]  # (day's answer module, input path) -> answer
+
+
+@cache
+def load_module(day: str, name: str = "answer") -> ModuleType:
+    """
+    Import `<day>/<name>.py` as a module. Puzzle directories start with digits, so they can't be
+    imported as regular packages
+    """
+    path = YEAR_DIR / day / f"{name}.py"
+    module_name = f"aoc2021_{day}_{name}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def discover_days() -> list[str]:
+    """
+    All puzzle directories containing a solver script (answer.py or answer_part*.py)
+    """
+    return sorted({path.parent.name for path in YEAR_DIR.glob("[0-9][0-9]_*/answer*.py")})
+
+
+@dataclass(frozen=True)
+class Day:
+    name: str  # puzzle directory, e.g. "01_sonar_sweep"
+    part1: PartSolver
+    part2: PartSolver
+    modules: tuple[str, str] = ("answer", "answer")  # module names used by part 1 and part 2
+    # appended to the input file's stem per part, e.g. "_part2": input.txt -> input_part2.txt
+    input_suffixes: tuple[str, str] = ("", "")
+
+    def module_path(self, part: int) -> Path:
+        return YEAR_DIR / self.name / f"{self.modules[part - 1]}.py"
+
+    def input_path(self, part: int, path: Path) -> Path:
+        """
+        Input file which is actually read by a part
+        """
+        return path.with_name(f"{path.stem}{self.input_suffixes[part - 1]}{path.suffix}")
+
+    def source_paths(self, part: int) -> list[Path]:
+        """
+        All sources a part's answer depends on: its module, the day's other modules (which it
+        may import) and the shared utils incl. this registry
+        """
+        day_modules = sorted((YEAR_DIR / self.name).glob("*.py"))
+        utils = sorted((YEAR_DIR / "utils").glob("*.py"))
+        module = self.module_path(part)
+        return [module] + [p for p in day_modules if p != module] + utils
+
+    def solve(self, part: int, path: Path) -> Any:
+        assert part in (1, 2)
+        solver = self.part1 if part == 1 else self.part2
+        module = load_module(self.name, self.modules[part - 1])
+        return solver(module, self.input_path(part, path))
+
+
+### Solvers which need more than a single expression ##############################################
+def _day02(m: ModuleType, path: Path, part: int) -> int:
+    model = m.PositionModel() if part == 1 else m.AimModel()
+    return m.interpret(path, [model])[0].answer()
+
+
+def _day04(m: ModuleType, path: Path, last: bool) -> int:
+    boards, seq = m.parse_input(path)
+    win_order = m.BingoEngine([board.numbers for board in boards]).win_order(seq)
+    return win_order[-1 if last else 0][2]
+
+
+def _day06(m: ModuleType, path: Path, days: int) -> int:
+    simulator = m.LanternfishSimulator(m.read_input_file(path))
+    simulator.simulate(days=days)
+    return simulator.size()
+
+
+def _day09_part1(m: ModuleType, path: Path) -> int:
+    height_map = m.parse_input_file(path)
+    return int((height_map + 1)[m.get_local_minima(height_map)].sum())
+
+
+def _day09_part2(m: ModuleType, path: Path) -> int:
+    basin_sizes = m.get_basin_sizes(m.parse_input_file(path))
+    return math.prod(sorted(basin_sizes.tolist(), reverse=True)[:3])
+
+
+def _day10(m: ModuleType, path: Path, part: int) -> int:
+    error_score, ac_score = m.score_file(path)
+    return error_score if part == 1 else ac_score.median()
+
+
+def _day11(m: ModuleType, path: Path, part: int) -> int | None:
+    energy_level_map = m.parse_input_file(path)
+    n_flashes = 0
+    for step_i in range(1000):
+        m.step(energy_level_map)
+        n_flashes_step_i = int((energy_level_map == 0).sum())
+        n_flashes += n_flashes_step_i
+        if part == 1 and step_i == 99:
+            return n_flashes
+        if part == 2 and n_flashes_step_i == energy_level_map.size:
+            return step_i + 1
+    return None
+
+
+def _day13(m: ModuleType, path: Path, part: int) -> int | str:
+    paper, folds = m.get_transp_paper(path)
+    if part == 1:
+        return int(m.fold_paper(paper, folds[:1]).sum())
+    folded_paper = m.fold_paper(paper, folds)
+    return "\n".join("".join("#" if dot else "." for dot in row) for row in folded_paper)
+
+
+def _day14(m: ModuleType, path: Path, part: int) -> int:
+    polymer, insertion_rules = m.parse_input(path)
+    if part == 1:
+        for _ in range(10):
+            polymer = m.insert_into_polymer(polymer, insertion_rules)
+        element_occ = {e: polymer.count(e) for e in set(polymer)}
+    else:
+        poly_pair_repr = m.PolymerPairRepr(polymer)
+        poly_pair_repr.insert(insertion_rules, iters=40)
+        element_occ = poly_pair_repr.get_element_occ()
+    return max(element_occ.values()) - min(element_occ.values())
+
+
+def _day16(m: ModuleType, path: Path, part: int) -> int:
+    packets = m.decode_binary_msg(m.get_binary_msg_from_file(path))
+    return m.version_sum(packets) if part == 1 else m.calc_packet_expr(packets)[0]
+
+
+def _day18(m: ModuleType, path: Path, part: int) -> int:
+    sf_numbers = m.parse_input_file(path)
+    if part == 1:
+        sf_number = sf_numbers[0]
+        for i in range(1, len(sf_numbers)):
+            sf_number += sf_numbers[i]
+        return sf_number.magnitude()
+    return max((x + y).magnitude() for x, y in itertools.permutations(sf_numbers, 2))
+
+
+def _day19(m: ModuleType, path: Path, part: int) -> int:
+    views = m.parse_input_file(path)
+    root_view = {0: views.pop(0)}
+    reg_views, viewer_pos = m.register_all_views(views, root_view)
+    if part == 1:
+        return len(set(itertools.chain(*reg_views.values())))
+    return max(
+        m.manhatten_distance(pt0, pt1)
+        for pt0, pt1 in itertools.combinations(viewer_pos.values(), 2)
+    )
+
+
+def _day20(m: ModuleType, path: Path, iters: int) -> int:
+    iea, img = m.parse_input_file(path)
+    return int(m.enhance_image(img, iea, iters).sum())
+
+
+def _day21_part2(m: ModuleType, path: Path) -> int:
+    m.n_universes_player1_wins, m.n_universes_player2_wins = 0, 0  # module level counters
+    m.one_turn_with_dirac_dice(*m.parse_input_file(path))
+    return max(m.n_universes_player1_wins, m.n_universes_player2_wins)
+
+
+def _day22(m: ModuleType, path: Path, part: int) -> int:
+    rectangles = m.parse_input_file(path)
+    if part == 1:
+        intersecting_rectangles = m.IntersectingRectanglesNaive()
+        rectangles = [(r_, a) for r_, a in rectangles if all(abs(v) <= 50 for r in r_ for v in r)]
+    else:
+        intersecting_rectangles = m.IntersectingRectangles()
+    for r_, add in rectangles:
+        intersecting_rectangles.add(r_) if add else intersecting_rectangles.subtract(r_)
+    return int(intersecting_rectangles.sum())
+
+
+def _day25(m: ModuleType, path: Path) -> int | None:
+    array = m.parse_input(path)
+    for idx in range(10000):
+        array_ = array
+        array = m.step(m.step(array, east=True), east=False)
+        if (array == array_).all():
+            return idx + 1
+    return None
+
+
+###################################################################################################
+DAYS: dict[str, Day] = {
+    day.name: day
+    for day in [
+        Day(
+            "01_sonar_sweep",
+            part1=lambda m, p: m.hm_larger_than_previous(p, 1),
+            part2=lambda m, p: m.hm_larger_than_previous(p, 3),
+        ),
+        Day(
+            "02_dive",
+            part1=lambda m, p: _day02(m, p, part=1),
+            part2=lambda m, p: _day02(m, p, part=2),
+        ),
+        Day(
+            "03_binary_diagnostics",
+            part1=lambda m, p: m.power_consumption_vectorized(p),
+            part2=lambda m, p: m.life_support_rating_indexed(p),
+        ),
+        Day(
+            "04_giant_squid",
+            part1=lambda m, p: _day04(m, p, last=False),
+            part2=lambda m, p: _day04(m, p, last=True),
+        ),
+        Day(
+            "05_hydrothermal_venture",
+            part1=lambda m, p: m.count_overlaps(p, no_diag_lines=True),
+            part2=lambda m, p: m.count_overlaps(p),
+        ),
+        Day(
+            "06_lanternfish",
+            part1=lambda m, p: _day06(m, p, days=80),
+            part2=lambda m, p: _day06(m, p, days=256),
+        ),
+        Day(
+            "07_the_treachery_of_whales",
+            part1=lambda m, p: m.optimize_alignment(
+                m.alignment_cost_part1, m.read_input_file(p)
+            )[1],
+            part2=lambda m, p: m.optimize_alignment(
+                m.alignment_cost_part2, m.read_input_file(p)
+            )[1],
+        ),
+        Day(
+            "08_seven_segment_search",
+            part1=lambda m, p: m.count_1s_4s_7s_bulk(m.parse_masks(p)),
+            part2=lambda m, p: int(m.decode_displays(m.parse_masks(p)).sum()),
+        ),
+        Day("09_smoke_basin", part1=_day09_part1, part2=_day09_part2),
+        Day(
+            "10_syntax_scoring",
+            part1=lambda m, p: _day10(m, p, part=1),
+            part2=lambda m, p: _day10(m, p, part=2),
+        ),
+        Day(
+            "11_dumbo_octopus",
+            part1=lambda m, p: _day11(m, p, part=1),
+            part2=lambda m, p: _day11(m, p, part=2),
+        ),
+        Day(
+            "12_passage_pathing",
+            part1=lambda m, p: len(m.find_all_paths(m.parse_input(p), m.path_cond_part1)),
+            part2=lambda m, p: len(m.find_all_paths(m.parse_input(p), m.path_cond_part2)),
+        ),
+        Day(
+            "13_transparent_origami",
+            part1=lambda m, p: _day13(m, p, part=1),
+            part2=lambda m, p: _day13(m, p, part=2),
+        ),
+        Day(
+            "14_extended_polymerization",
+            part1=lambda m, p: _day14(m, p, part=1),
+            part2=lambda m, p: _day14(m, p, part=2),
+        ),
+        Day(
+            "15_chiton",
+            part1=lambda m, p: int(m.find_shortest_path_cost(m.parse_input_file(p))),
+            part2=lambda m, p: int(
+                m.find_shortest_path_cost(m.get_array_mxn(m.parse_input_file(p), 5, 5))
+            ),
+        ),
+        Day(
+            "16_packet_decoder",
+            part1=lambda m, p: _day16(m, p, part=1),
+            part2=lambda m, p: _day16(m, p, part=2),
+        ),
+        Day(
+            "17_trick_shot",
+            part1=lambda m, p: sum(range(-m.parse_input_file(p).y0)),
+            part2=lambda m, p: int(
+                m.TrickShotSimulator(m.parse_input_file(p)).grid_search().sum()
+            ),
+        ),
+        Day(
+            "18_snailfish",
+            part1=lambda m, p: _day18(m, p, part=1),
+            part2=lambda m, p: _day18(m, p, part=2),
+        ),
+        Day(
+            "19_beacon_scanner",
+            part1=lambda m, p: _day19(m, p, part=1),
+            part2=lambda m, p: _day19(m, p, part=2),
+        ),
+        Day(
+            "20_trench_map",
+            part1=lambda m, p: _day20(m, p, iters=2),
+            part2=lambda m, p: _day20(m, p, iters=50),
+        ),
+        Day(
+            "21_dirac_dice",
+            part1=lambda m, p: m.dirac_dice_practice_game(*m.parse_input_file(p))[1],
+            part2=_day21_part2,
+        ),
+        Day(
+            "22_reactor_reboot",
+            part1=lambda m, p: _day22(m, p, part=1),
+            part2=lambda m, p: _day22(m, p, part=2),
+        ),
+        Day(
+            "23_amphipod",
+            part1=lambda m, p: m.Graph(start_state=m.parse_input_file(p)).best_cost,
+            part2=lambda m, p: m.Graph(start_state=m.parse_input_file(p)).best_cost,
+            input_suffixes=("", "_part2"),  # the unfolded diagram is stored next to the folded
+        ),
+        Day(
+            "24_alu",
+            part1=lambda m, p: m.Monad(p).search_largest_number(),
+            part2=lambda m, p: m.Monad(p).search_smallest_number(),
+        ),
+        Day("25_sea_cucumber", part1=_day25, part2=lambda m, p: None),  # no part 2 puzzle
+    ]
+}
@@ -0,0 +1,73 @@
+import mmap
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+DIGITS = "0123456789"
+_INVALID = 255
+
+
+def _lookup_table(symbols: str) -> np.ndarray:
+    lut = np.full(256, _INVALID, dtype=np.uint8)
+    lut[np.frombuffer(symbols.encode(), dtype=np.uint8)] = np.arange(len(symbols))
+    return lut
+
+
+def _layout(mm: mmap.mmap, skip_lines: int, path: Path) -> tuple[int, int, int, int]:
+    """
+    Layout of the grid in the mapped file: (offset of the first row, row stride, width, n_rows)
+    """
+    start = 0
+    for _ in range(skip_lines):
+        start = mm.find(b"\n", start) + 1
+    end = len(mm)
+    while end > start and mm[end - 1] in b"\r\n":  # ignore trailing newlines
+        end -= 1
+    line_end = mm.find(b"\n", start, end)
+    line_end = end if line_end < 0 else line_end
+    stride = line_end - start + 1  # row incl. newline
+    width = stride - 1 - (line_end > start and mm[line_end - 1] == ord("\r"))
+    n_rows = (end - start + stride - width) // stride
+    if n_rows * stride - (stride - width) != end - start:
+        raise ValueError(f"Rows of {path} have different lengths")
+    return start, stride, width, n_rows
+
+
+def grid_shape(path: Path, skip_lines: int = 0) -> tuple[int, int]:  # n_rows, width
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        _, _, width, n_rows = _layout(mm, skip_lines, path)
+    return n_rows, width
+
+
+def load_grid(
+    path: Path,
+    symbols: str = DIGITS,
+    skip_lines: int = 0,
+    row_range: Optional[tuple[int, int]] = None,
+) -> np.ndarray:
+    """
+    Loads a character grid (one row per line) as uint8 array, each character is replaced by its
+    index in `symbols`: DIGITS -> digit values, ".#" -> 0/1, ".>v" -> 0/1/2.
+    The file is memory mapped and translated with a lookup table, there is no per-character
+    Python work. `skip_lines` lines before the grid (e.g. a header) are ignored. `row_range`
+    (start, stop) only loads this band of rows, e.g. to process grids larger than the memory
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start, stride, width, n_rows = _layout(mm, skip_lines, path)
+        row_start, row_stop = row_range or (0, n_rows)
+        row_start, row_stop = min(max(row_start, 0), n_rows), min(row_stop, n_rows)
+        n_rows = max(row_stop - row_start, 0)
+        start = min(start + row_start * stride, len(mm))
+
+        count = max(n_rows * stride - (stride - width), 0)
+        data = np.frombuffer(mm, dtype=np.uint8, count=count, offset=start)
+        rows = np.lib.stride_tricks.as_strided(data, (n_rows, width), (stride, 1), writeable=False)
+        grid = _lookup_table(symbols)[rows]  # the only copy: mapped bytes -> symbol indices
+        del data, rows  # release the buffer exports before the mmap is closed
+
+    if grid.size and grid.max() == _INVALID:
+        row, col = np.argwhere(grid == _INVALID)[0]
+        raise ValueError(f"Unexpected character in {path} at row {row + row_start}, col {col}")
+    return grid